@@ -0,0 +1,90 @@
+"""
+Batch Writer Module
+Coalesces concurrent Supabase inserts into one PostgREST call, so a burst of
+saved cards pays for a single round trip instead of one each
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 32  # rows sent in one insert call
+
+
+class BatchedInserter:
+    """
+    Group-commit style inserter for one table
+
+    A row submitted while no write is running is inserted straight away, so a
+    lone save never waits; rows submitted while a write is in flight queue up
+    and go out together in the next insert.
+    """
+
+    def __init__(self, client, table: str, max_batch: int = MAX_BATCH_SIZE):
+        self.client = client
+        self.table = table
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    async def submit(self, row: Dict) -> Dict:
+        """Queue a row and return it as stored (including its generated id)"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        while self._pending:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            await self._write(batch)
+
+    def _insert(self, rows: List[Dict]) -> List[Dict]:
+        return self.client.table(self.table).insert(rows).execute().data
+
+    async def _write(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        try:
+            saved = await asyncio.to_thread(self._insert, [row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=e)
+                return
+            # One bad row fails the whole insert; retry row by row so only it errors
+            logger.warning(f"⚠️ Batched insert into {self.table} failed, retrying {len(batch)} rows individually: {e}")
+            for row, future in batch:
+                try:
+                    _resolve(future, (await asyncio.to_thread(self._insert, [row]))[0])
+                except Exception as row_error:
+                    _resolve(future, error=row_error)
+            return
+        if len(batch) > 1:
+            logger.info(f"💾 Inserted {len(batch)} rows into {self.table} in one call")
+        for (_, future), row in zip(batch, saved):
+            _resolve(future, row)
+
+
+def _resolve(future: asyncio.Future, result: Dict = None, error: Exception = None):
+    if future.done():  # the submitter was cancelled
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def create_batched_inserter(client, table: str) -> Optional[BatchedInserter]:
+    """
+    Create a batched inserter for a Supabase table
+
+    Args:
+        client: Supabase client (None when the database is not configured)
+        table: Table name
+
+    Returns:
+        BatchedInserter instance, or None without a client
+    """
+    return BatchedInserter(client, table) if client is not None else None
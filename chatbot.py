@@ -6,16 +6,22 @@ Provides intelligent responses and acts as an AI agent
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from dotenv import load_dotenv
+from cachetools import TTLCache
 import google.generativeai as genai
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+MAX_SESSIONS = 10_000  # least recently used sessions are evicted past this
+SESSION_TTL = 24 * 60 * 60  # seconds an idle chat session is kept
+MAX_SESSION_MESSAGES = 100  # oldest messages drop off past this
+
 @dataclass
 class ChatMessage:
     """Data class for chat messages"""
@@ -79,7 +85,11 @@ class GeminiChatbot:
             else:
                 raise RuntimeError(f"Gemini initialization failed: {e}")
             
-        self.sessions: Dict[str, ChatSession] = {}
+        # TTLCache expires entries a fixed time after they are set, so every
+        # access re-sets the session to make the TTL count from its last use.
+        # Chat turns run in worker threads and TTLCache is not thread-safe.
+        self.sessions: Dict[str, ChatSession] = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL)
+        self._sessions_lock = threading.RLock()
         
         # System prompt for the AI agent
         self.system_prompt = """You are an intelligent AI agent for a Business Card OCR application. Your role is to:
@@ -97,7 +107,13 @@ You have access to:
 - Industry knowledge and business intelligence
 
 Be helpful, professional, and provide actionable insights. When discussing people or companies, be respectful and factual. If you don't have specific information, clearly state that and offer to help find it."""
-    
+
+        # Use simpler generation config for chat turns
+        self.generation_config = {
+            "temperature": 0.7,
+            "max_output_tokens": 500,
+        }
+
     def create_session(self, session_id: str, context: Dict = None) -> ChatSession:
         """
         Create a new chat session
@@ -115,13 +131,18 @@ Be helpful, professional, and provide actionable insights. When discussing peopl
             created_at=datetime.now(),
             context=context or {}
         )
-        self.sessions[session_id] = session
+        with self._sessions_lock:
+            self.sessions[session_id] = session
         logger.info(f"Created new chat session: {session_id}")
         return session
     
     def get_session(self, session_id: str) -> Optional[ChatSession]:
-        """Get existing chat session"""
-        return self.sessions.get(session_id)
+        """Get existing chat session, restarting its idle timeout"""
+        with self._sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.sessions[session_id] = session
+            return session
     
     def add_message(self, session_id: str, role: str, content: str, metadata: Dict = None) -> ChatMessage:
         """
@@ -136,9 +157,6 @@ Be helpful, professional, and provide actionable insights. When discussing peopl
         Returns:
             ChatMessage object
         """
-        if session_id not in self.sessions:
-            self.create_session(session_id)
-        
         message = ChatMessage(
             role=role,
             content=content,
@@ -146,7 +164,12 @@ Be helpful, professional, and provide actionable insights. When discussing peopl
             metadata=metadata or {}
         )
         
-        self.sessions[session_id].messages.append(message)
+        with self._sessions_lock:
+            session = self.get_session(session_id) or self.create_session(session_id)
+            messages = session.messages
+            messages.append(message)
+            if len(messages) > MAX_SESSION_MESSAGES:
+                del messages[:-MAX_SESSION_MESSAGES]
         return message
     
     def generate_response(self, session_id: str, user_message: str, context: Dict = None) -> Dict[str, Any]:
@@ -169,29 +192,14 @@ Be helpful, professional, and provide actionable insights. When discussing peopl
             
             # Add user message to session
             self.add_message(session_id, "user", user_message)
-            
-            try:
-                # Simplify the prompt to avoid context issues
-                # Use just the user message with basic system context
-                simple_prompt = f"""You are a helpful AI assistant for a business networking application. 
-
-Current context: You are helping with professional networking and business insights.
-
-User message: {user_message}
+            fallback_used = False
 
-Please provide a helpful, professional response:"""
-
-                # Use simpler generation config
-                generation_config = {
-                    "temperature": 0.7,
-                    "max_output_tokens": 500,
-                }
-                
+            try:
                 logger.info(f"Generating response for session {session_id}")
-                
+
                 response = self.model.generate_content(
-                    simple_prompt,
-                    generation_config=generation_config
+                    self._build_simple_prompt(user_message, context or session.context),
+                    generation_config=self.generation_config
                 )
                 
                 # Extract response text with better error handling
@@ -221,6 +229,7 @@ Please provide a helpful, professional response:"""
                     if not response_content and hasattr(response, 'candidates') and response.candidates:
                         candidate = response.candidates[0]
                         if hasattr(candidate, 'finish_reason'):
+                            fallback_used = True
                             finish_reason = candidate.finish_reason
                             if finish_reason == 2:  # SAFETY
                                 response_content = "I appreciate your question! Let me help you with professional networking insights. What specific aspect would you like to explore?"
@@ -231,6 +240,7 @@ Please provide a helpful, professional response:"""
                 
                 # Fallback if no content extracted
                 if not response_content or len(response_content.strip()) < 3:
+                    fallback_used = True
                     response_content = self._generate_smart_response(user_message)
                     logger.warning(f"Using smart fallback response for session {session_id}")
                 
@@ -238,6 +248,7 @@ Please provide a helpful, professional response:"""
                         
             except Exception as api_error:
                 logger.error(f"Gemini API error: {api_error}")
+                fallback_used = True
                 # Check for specific error types
                 error_str = str(api_error).lower()
                 if "api key" in error_str or "authentication" in error_str:
@@ -261,6 +272,7 @@ Please provide a helpful, professional response:"""
                 "session_id": session_id,
                 "timestamp": datetime.now().isoformat(),
                 "success": response is not None,
+                "fallback_used": fallback_used,
                 "token_usage": {
                     "input_tokens": 0,  # Not directly available in Gemini response
                     "output_tokens": 0  # Not directly available in Gemini response
@@ -280,22 +292,112 @@ Please provide a helpful, professional response:"""
                 "session_id": session_id,
                 "timestamp": datetime.now().isoformat(),
                 "success": True,
+                "fallback_used": True,
                 "error": str(e)
             }
     
+    def stream_response(self, session_id: str, user_message: str, context: Dict = None) -> Iterator[str]:
+        """
+        Stream AI response to user message chunk by chunk
+
+        Args:
+            session_id: Session identifier
+            user_message: User's message
+            context: Additional context (business card data, etc.)
+
+        Yields:
+            Text deltas as they arrive from Gemini
+        """
+        session = self.get_session(session_id) or self.create_session(session_id, context)
+
+        self.add_message(session_id, "user", user_message)
+
+        parts = []
+        # Set when Gemini errors mid-stream or a chunk is dropped, so the reply may be cut short
+        interrupted = False
+        try:
+            logger.info(f"Streaming response for session {session_id}")
+
+            response = self.model.generate_content(
+                self._build_simple_prompt(user_message, context or session.context),
+                generation_config=self.generation_config,
+                stream=True
+            )
+
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunk carries no text (e.g. blocked by safety filters)
+                    interrupted = True
+                    continue
+                if text:
+                    parts.append(text)
+                    yield text
+
+        except Exception as api_error:
+            logger.error(f"Gemini streaming error: {api_error}")
+            interrupted = True
+
+        response_content = ''.join(parts).strip()
+        fallback_used = len(response_content) < 3
+        if fallback_used:
+            response_content = self._generate_smart_response(user_message)
+            logger.warning(f"Using smart fallback response for session {session_id}")
+            yield response_content
+
+        self.add_message(session_id, "assistant", response_content, {
+            "fallback_used": fallback_used,
+            "interrupted": interrupted
+        })
+
+    def _build_simple_prompt(self, user_message: str, context: Dict = None) -> str:
+        """Build the simplified prompt used for chat turns"""
+        # The user message with basic system context, plus the compact profile being discussed
+        profile = "\n".join(self._profile_context_lines(context))
+        profile_block = f"{profile}\n\n" if profile else ""
+        return f"""You are a helpful AI assistant for a business networking application.
+
+Current context: You are helping with professional networking and business insights.
+
+{profile_block}User message: {user_message}
+
+Please provide a helpful, professional response:"""
+
+    def _profile_context_lines(self, context: Optional[Dict]) -> List[str]:
+        """Compact description of the business card and web research summary in a context"""
+        if not context:
+            return []
+        lines = []
+        card_data = context.get("business_card")
+        if card_data:
+            lines.append("Current business card context:")
+            lines.append(f"- Name: {card_data.get('name', 'N/A')}")
+            lines.append(f"- Company: {card_data.get('company', 'N/A')}")
+            lines.append(f"- Email: {card_data.get('email', 'N/A')}")
+            lines.append(f"- Phone: {card_data.get('phone', 'N/A')}")
+        web_info = context.get("web_info")
+        if web_info:
+            lines.append("Web research summary:")
+            if web_info.get("role"):
+                lines.append(f"- Role: {web_info['role']}")
+            if web_info.get("industry"):
+                lines.append(f"- Industry: {web_info['industry']}")
+            if web_info.get("bio"):
+                lines.append(f"- Bio: {web_info['bio']}")
+            if web_info.get("notable_links"):
+                lines.append(f"- Links: {', '.join(map(str, web_info['notable_links']))}")
+        return lines
+
     def _build_context_prompt(self, session: ChatSession, additional_context: Dict = None) -> str:
         """Build context-aware system prompt"""
         context_parts = [self.system_prompt]
         
         # Add session context
         if session.context:
-            if "business_card" in session.context:
-                card_data = session.context["business_card"]
-                context_parts.append(f"\nCurrent business card context:")
-                context_parts.append(f"- Name: {card_data.get('name', 'N/A')}")
-                context_parts.append(f"- Company: {card_data.get('company', 'N/A')}")
-                context_parts.append(f"- Email: {card_data.get('email', 'N/A')}")
-                context_parts.append(f"- Phone: {card_data.get('phone', 'N/A')}")
+            profile = self._profile_context_lines(session.context)
+            if profile:
+                context_parts.append("\n" + "\n".join(profile))
             
             if "scraped_info" in session.context:
                 context_parts.append(f"\nAdditional information available about this person/company from web research.")
@@ -497,8 +599,9 @@ Format as a simple list of questions."""
     
     def clear_session(self, session_id: str) -> bool:
         """Clear a chat session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        with self._sessions_lock:
+            session = self.sessions.pop(session_id, None)
+        if session is not None:
             logger.info(f"Cleared session: {session_id}")
             return True
         return False
@@ -506,7 +609,9 @@ Format as a simple list of questions."""
     def get_all_sessions(self) -> List[Dict]:
         """Get all active sessions summary"""
         sessions_summary = []
-        for session_id, session in self.sessions.items():
+        with self._sessions_lock:
+            sessions = list(self.sessions.items())
+        for session_id, session in sessions:
             sessions_summary.append({
                 "session_id": session_id,
                 "message_count": len(session.messages),
@@ -0,0 +1,13 @@
+"""
+Shared pytest setup for the diagnostic test scripts
+"""
+
+import pytest
+from dotenv import load_dotenv
+
+
+@pytest.fixture(scope="session", autouse=True)
+def load_env():
+    """Read .env once per pytest session instead of once per test module"""
+    load_dotenv()
+    yield
@@ -4,6 +4,8 @@ Sends automated emails to business card contacts
 """
 
 import os
+import re
+import asyncio
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -15,6 +17,8 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+HTML_TAG_RE = re.compile('<[^<]+?>')  # strips tags for the plain-text fallback body
+
 
 class EmailService:
     """Email service for sending automated emails using SendGrid"""
@@ -304,48 +308,68 @@ class EmailService:
         Returns:
             Summary of sent emails
         """
-        results = {
-            "total": len(contacts),
-            "sent": 0,
-            "failed": 0,
-            "details": []
-        }
+        return self._summarize_batch([self._send_batch_contact(contact) for contact in contacts])
+    
+    async def send_batch_emails_async(self, contacts: List[Dict], concurrency: int = 20) -> Dict:
+        """
+        Send emails to multiple contacts with up to `concurrency` SendGrid requests in flight
+        
+        Args:
+            contacts: List of dicts with 'email', 'name', and optional 'company' keys
+            concurrency: Maximum number of emails sent at the same time
+            
+        Returns:
+            Summary of sent emails (details keep the order of contacts)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def send_one(contact: Dict) -> Dict:
+            async with semaphore:
+                return await asyncio.to_thread(self._send_batch_contact, contact)
         
-        for contact in contacts:
-            email = contact.get("email")
-            name = contact.get("name", "there")
-            company = contact.get("company")
-            
-            if not email or not email.strip():
-                results["failed"] += 1
-                results["details"].append({
-                    "name": name,
-                    "email": None,
-                    "status": "failed",
-                    "reason": "No email provided"
-                })
-                continue
-            
-            result = self.send_welcome_email(email.strip(), name, company)
-            
-            if result["success"]:
-                results["sent"] += 1
-                results["details"].append({
-                    "name": name,
-                    "email": email,
-                    "status": "sent",
-                    "message_id": result.get("message_id"),
-                    "status_code": result.get("status_code")
-                })
-            else:
-                results["failed"] += 1
-                results["details"].append({
-                    "name": name,
-                    "email": email,
-                    "status": "failed",
-                    "reason": result["message"]
-                })
+        details = await asyncio.gather(*(send_one(contact) for contact in contacts))
+        return self._summarize_batch(list(details))
+    
+    def _send_batch_contact(self, contact: Dict) -> Dict:
+        """Send the welcome email for one batch contact and return its detail entry"""
+        email = contact.get("email")
+        name = contact.get("name", "there")
+        company = contact.get("company")
+        
+        if not email or not email.strip():
+            return {
+                "name": name,
+                "email": None,
+                "status": "failed",
+                "reason": "No email provided"
+            }
+        
+        result = self.send_welcome_email(email.strip(), name, company)
         
+        if result["success"]:
+            return {
+                "name": name,
+                "email": email,
+                "status": "sent",
+                "message_id": result.get("message_id"),
+                "status_code": result.get("status_code")
+            }
+        return {
+            "name": name,
+            "email": email,
+            "status": "failed",
+            "reason": result["message"]
+        }
+    
+    def _summarize_batch(self, details: List[Dict]) -> Dict:
+        """Build the batch summary from per-contact detail entries"""
+        sent = sum(1 for detail in details if detail["status"] == "sent")
+        results = {
+            "total": len(details),
+            "sent": sent,
+            "failed": len(details) - sent,
+            "details": details
+        }
         logger.info(f"Batch email complete: {results['sent']}/{results['total']} sent")
         return results
     
@@ -374,8 +398,7 @@ class EmailService:
             # If no plain text provided, create a simple version
             if not plain_text:
                 # Strip HTML tags for plain text (basic)
-                import re
-                plain_text = re.sub('<[^<]+?>', '', html_content)
+                plain_text = HTML_TAG_RE.sub('', html_content)
             
             message = Mail(
                 from_email=Email(self.from_email, self.from_name),
@@ -5,27 +5,52 @@ Direct workflow: OCR → Web Scraping → Chat Interface with Profile Summary
 
 import os
 import json
-import uuid
+import secrets
+import orjson
+import binascii
 import logging
 import asyncio
+import traceback
+import hashlib
+import itertools
+import weakref
+import tempfile
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
-from fastapi import FastAPI, Form, File, UploadFile, Request, HTTPException, Depends, status, Query, Header
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, Form, File, UploadFile, Request, HTTPException, Depends, status, Query, Header, BackgroundTasks
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, StreamingResponse, Response
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import iterate_in_threadpool
 from fastapi.staticfiles import StaticFiles
+from jinja2 import FileSystemBytecodeCache, select_autoescape
+from PIL import Image
 
 # Load environment variables
 env_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(env_path)
+
+# API keys are read once, after .env is loaded
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 from pydantic import BaseModel, Field
 
 # Import existing modules
 from ocr import (
     supabase, 
+    card_writer,
     verify_api_key, 
     extract_fields_with_llama,
+    open_card_image,
+    looks_like_image,
+    MAX_UPLOAD,
+    StaticPage,
+    warm_up_image_pipeline,
+    warm_up_llama_connection,
+    close_llama_client,
     BusinessCardCreate,
     BusinessCardResponse,
     APIResponse
@@ -35,17 +60,32 @@ from ocr import (
 from tavily_direct import TavilyDirect, create_scraper
 from chatbot import GeminiChatbot, create_chatbot
 from email_service import EmailService, create_email_service
-from webhook_handler import SendGridWebhookHandler, create_webhook_handler
+from webhook_handler import SendGridWebhookHandler, create_webhook_handler, WEBHOOK_BATCH_SIZE
 from followup_scheduler import FollowUpEmailScheduler, create_followup_scheduler
+from session_store import SessionStore, create_session_store, MAX_CHAT_HISTORY
+from response_cache import ResponseCache, create_response_cache
 
 from contextlib import asynccontextmanager
 
+BLOCKING_POOL_SIZE = int(os.getenv("BLOCKING_POOL_SIZE", "32"))
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "8"))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting application initialization...")
+    # OCR and scraping calls are network-bound; give asyncio.to_thread room for them
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_POOL_SIZE, thread_name_prefix="blocking")
+    )
     try:
         initialize_services()
+        warm_up_image_pipeline()
+        # Handshake with the vision endpoint in the background; startup doesn't wait on it
+        asyncio.create_task(warm_up_llama_connection())
+        # Compile every template up front (from the bytecode cache when warm)
+        for template_name in templates.env.list_templates(extensions=["html"]):
+            templates.get_template(template_name)
         logger.info("🚀 Streamlined OCR Chat application started")
         logger.info(f"🌐 Web Interface: http://127.0.0.1:8000/")
         logger.info(f"📚 API Documentation: http://127.0.0.1:8000/docs")
@@ -53,24 +93,38 @@ async def lifespan(app: FastAPI):
         # Log service status
         logger.info(f"Services initialized: web_scraper={web_scraper is not None}, ai_chatbot={ai_chatbot is not None}, email_service={email_service is not None}")
     except Exception as init_error:
-        logger.error(f"❌ Initialization error: {init_error}")
-        import traceback
-        logger.error(f"❌ Initialization traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Initialization error: {init_error}", exc_info=True)
     
     yield
     # Shutdown
     logger.info("Application shutting down...")
+    if web_scraper and hasattr(web_scraper, "close"):
+        web_scraper.close()
+        await web_scraper.aclose()
+    await close_llama_client()
+    await session_store.close()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
     title="Streamlined Business Card OCR with AI Chat",
     description="Upload business card → Get AI analysis → Chat with profile information",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Templates
-templates = Jinja2Templates(directory="templates")
+# Templates: compiled bytecode is cached on disk and mtime checks are off
+# unless TEMPLATE_AUTO_RELOAD=true (useful while editing templates locally)
+template_cache_dir = os.path.join(tempfile.gettempdir(), "jinja_cache")
+os.makedirs(template_cache_dir, exist_ok=True)
+templates = Jinja2Templates(
+    directory="templates",
+    bytecode_cache=FileSystemBytecodeCache(directory=template_cache_dir),
+    auto_reload=os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true",
+    autoescape=select_autoescape(["html"]),
+)
+# The landing page has no per-request content, so it is rendered once
+home_page = StaticPage(templates, "streamlined_form.html")
 
 logger = logging.getLogger(__name__)
 
@@ -81,35 +135,189 @@ email_service: Optional[EmailService] = None
 webhook_handler: Optional[SendGridWebhookHandler] = None
 followup_scheduler: Optional[FollowUpEmailScheduler] = None
 
-# Session storage for profiles
-user_sessions: Dict[str, Dict] = {}
+# Session storage for profiles (Redis when REDIS_URL is set, else in-process)
+session_store: SessionStore = create_session_store()
+
+# Cached chatbot replies keyed on (normalized message, profile context)
+response_cache: ResponseCache = create_response_cache()
+
+# Per-session chat locks (dropped once no request holds or waits on them)
+# and in-flight replies keyed by (session_id, message)
+session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+inflight_chats: Dict[str, asyncio.Future] = {}
+
+# In-flight and recently finished web scrapes keyed by (method, name, company)
+inflight_scrapes: Dict[tuple, asyncio.Future] = {}
+SCRAPE_CACHE_TTL = 300  # seconds a scrape result is reused for the same person
+scrape_cache: TTLCache = TTLCache(maxsize=512, ttl=SCRAPE_CACHE_TTL)
+
+# Caps concurrent calls to the vision endpoint so an upload burst queues here
+# instead of filling the blocking pool that scraping and Supabase share
+ocr_slots = asyncio.Semaphore(OCR_CONCURRENCY)
+
+# Opening assistant messages, keyed by (source, has_company)
+GREETINGS = {
+    ("manual", True): "Hello! I've gathered information about {name} from {company}. How can I help you with networking and professional insights?",
+    ("manual", False): "Hello! I've gathered information about {name}. How can I help you with networking and professional insights?",
+    ("ocr", True): "I've analyzed the business card for {name} from {company}. I've also gathered additional information from the web. What would you like to know?",
+    ("ocr", False): "I've analyzed the business card for {name}. I've also gathered additional information from the web. What would you like to know?",
+}
+
+def _summarize_web_info(web_info: Optional[Dict]) -> Optional[Dict]:
+    """Reduce scraped web info to the compact fields the chatbot needs"""
+    if not web_info:
+        return None
+    professional = web_info.get("professional_info") or {}
+    links = web_info.get("social_links") or {}
+    return {
+        "role": professional.get("title"),
+        "industry": professional.get("industry"),
+        "bio": (web_info.get("summary") or "")[:600],
+        "notable_links": list(links.values())[:5],
+    }
+
+async def _scrape_once(method: str, name: str, company: Optional[str]) -> Dict:
+    """
+    Run a web scraper method for a person, sharing one Tavily round-trip
+    between concurrent callers and reusing the result for SCRAPE_CACHE_TTL
+    """
+    key = (method, name.strip().lower(), (company or "").strip().lower())
+    cached = scrape_cache.get(key)
+    if cached is not None:
+        return cached
+    pending = inflight_scrapes.get(key)
+    if pending is not None:
+        logger.info(f"♻️ Reusing in-flight web scrape for {name}")
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    inflight_scrapes[key] = future
+    try:
+        scrape = getattr(web_scraper, method)
+        if asyncio.iscoroutinefunction(scrape):
+            result = await scrape(name, company)
+        else:
+            result = await asyncio.to_thread(scrape, name, company)
+        # Fallback results are not cached so the next request retries Tavily
+        if not result.get("fallback_used"):
+            scrape_cache[key] = result
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved so asyncio does not log it
+        future.exception()
+        raise
+    finally:
+        if not future.done():
+            # The owner was cancelled; waiters get a regular error (and their
+            # fallback) instead of a CancelledError that would kill their task
+            future.set_exception(RuntimeError("scrape cancelled"))
+            future.exception()
+        inflight_scrapes.pop(key, None)
+
+async def _chat_context(session_id: str, session_data: Dict) -> Dict:
+    """
+    Chatbot context for a session; once web info has arrived the context and
+    its response-cache digest are built once and stored with the session
+    """
+    if "chat_context" in session_data:
+        return session_data["chat_context"]
+    context = {
+        "business_card": session_data["user_info"],
+        "web_info": _summarize_web_info(session_data.get("web_info"))
+    }
+    if "ocr_fields" in session_data:
+        context["ocr_fields"] = session_data["ocr_fields"]
+    digest = ResponseCache.context_digest(context)
+    if session_data.get("web_info"):
+        session_data["chat_context"] = context
+        session_data["chat_context_digest"] = digest
+        await session_store.update(session_id, chat_context=context, chat_context_digest=digest)
+    else:
+        session_data["chat_context_digest"] = digest
+    return context
+
+def _now_iso() -> str:
+    """Timestamp string for session, chat and response records"""
+    return datetime.now().isoformat(timespec="milliseconds")
+
+async def get_session_or_404(session_id: str) -> Dict:
+    """Dependency: look up the path's session once, raising 404 if it doesn't exist"""
+    session_data = await session_store.get(session_id)
+    if session_data is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session_data
+
+def _session_lock(session_id: str) -> asyncio.Lock:
+    """Lock serializing one session's chat turns, so replies see each other's history"""
+    lock = session_locks.get(session_id)
+    if lock is None:
+        lock = session_locks[session_id] = asyncio.Lock()
+    return lock
+
+async def _ensure_session(session_id: str) -> Dict:
+    """Return the session, auto-creating a guest session if it doesn't exist"""
+    session_data = await session_store.get(session_id)
+    if session_data is None:
+        session_data = await session_store.create(session_id, {
+            "user_info": {
+                "name": "Guest User",
+                "company": "Unknown",
+                "email": "guest@example.com",
+                "phone": "Unknown"
+            },
+            "created_at": _now_iso()
+        })
+        logger.info(f"🔄 Auto-created session {session_id}")
+    return session_data
+
+def _open_upload(file: UploadFile, limit: int = MAX_UPLOAD) -> Image.Image:
+    """
+    Check an upload's size and magic bytes, then decode it lazily from the
+    multipart temp file instead of copying the payload into memory
+    """
+    upload = file.file
+    size = file.size
+    if size is None:
+        upload.seek(0, os.SEEK_END)
+        size = upload.tell()
+    if size > limit:
+        raise HTTPException(status_code=413, detail=f"File too large (max {limit // (1024 * 1024)} MB)")
+    upload.seek(0)
+    header = upload.read(16)
+    upload.seek(0)
+    if not looks_like_image(header):
+        raise HTTPException(status_code=400, detail="File must be a JPEG, PNG, GIF or WebP image")
+    return open_card_image(upload)
+
+async def _run_ocr(image: Image.Image) -> Dict:
+    """Extract card fields, at most OCR_CONCURRENCY vision calls at a time"""
+    async with ocr_slots:
+        return await extract_fields_with_llama(image)
 
 def initialize_services():
     """Initialize web scraper, chatbot, email services, webhook handler, and follow-up scheduler"""
     global web_scraper, ai_chatbot, email_service, webhook_handler, followup_scheduler
     
     # Initialize web scraper
-    tavily_api_key = os.getenv("TAVILY_API_KEY")
-    logger.info(f"🔍 Tavily API key found: {'Yes' if tavily_api_key else 'No'}")
-    logger.info(f"🔍 Tavily key starts with: {tavily_api_key[:10] + '...' if tavily_api_key else 'None'}")
+    tavily_api_key = TAVILY_API_KEY
+    logger.info("🔍 Tavily API key found: %s", bool(tavily_api_key))
     
     if tavily_api_key and tavily_api_key != "your-tavily-api-key-here":
         try:
             web_scraper = create_scraper(tavily_api_key)
             logger.info("✅ Tavily web scraper initialized successfully")
         except Exception as scraper_error:
-            logger.error(f"❌ Failed to initialize Tavily scraper: {scraper_error}")
-            import traceback
-            logger.error(f"❌ Tavily scraper error traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Failed to initialize Tavily scraper: {scraper_error}", exc_info=True)
             web_scraper = None
     else:
         logger.warning("⚠️ Tavily API key not valid - web scraping disabled")
         web_scraper = None
     
     # Initialize chatbot
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
-    logger.info(f"🤖 Gemini API key found: {'Yes' if gemini_api_key else 'No'}")
-    logger.info(f"🤖 Gemini key starts with: {gemini_api_key[:10] + '...' if gemini_api_key else 'None'}")
+    gemini_api_key = GEMINI_API_KEY
+    logger.info("🤖 Gemini API key found: %s", bool(gemini_api_key))
     
     if gemini_api_key and gemini_api_key != "your-gemini-api-key-here":
         try:
@@ -122,27 +330,22 @@ def initialize_services():
             logger.error(f"❌ Gemini runtime error: {re}")
             ai_chatbot = None
         except Exception as chatbot_error:
-            logger.error(f"❌ Failed to initialize Gemini chatbot: {chatbot_error}")
-            import traceback
-            logger.error(f"❌ Gemini chatbot error traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Failed to initialize Gemini chatbot: {chatbot_error}", exc_info=True)
             ai_chatbot = None
     else:
         logger.warning("⚠️ Gemini API key not valid - chatbot disabled")
         ai_chatbot = None
     
     # Initialize email service
-    sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
-    logger.info(f"📧 SendGrid API key found: {'Yes' if sendgrid_api_key else 'No'}")
+    sendgrid_api_key = SENDGRID_API_KEY
+    logger.info("📧 SendGrid API key found: %s", bool(sendgrid_api_key))
     
     if sendgrid_api_key and sendgrid_api_key != "your-sendgrid-api-key-here":
         try:
-            from ocr import supabase  # Import supabase for email tracking
             email_service = create_email_service(sendgrid_api_key, supabase_client=supabase)
             logger.info("✅ SendGrid email service initialized successfully")
         except Exception as email_error:
-            logger.error(f"❌ Failed to initialize SendGrid: {email_error}")
-            import traceback
-            logger.error(f"❌ SendGrid error traceback: {traceback.format_exc()}")
+            logger.error(f"❌ Failed to initialize SendGrid: {email_error}", exc_info=True)
             email_service = None
     else:
         logger.warning("⚠️ SendGrid API key not valid - email service disabled")
@@ -150,7 +353,6 @@ def initialize_services():
 
     # Initialize webhook handler (needs Supabase)
     try:
-        from ocr import supabase  # Import supabase from ocr module
         webhook_handler = create_webhook_handler(supabase)
         logger.info("✅ SendGrid webhook handler initialized successfully")
     except Exception as webhook_error:
@@ -160,7 +362,6 @@ def initialize_services():
     # Initialize follow-up scheduler (needs email service and supabase)
     if email_service:
         try:
-            from ocr import supabase  # Import supabase from ocr module
             followup_scheduler = create_followup_scheduler(email_service, supabase)
             # Start the scheduler with 2-minute threshold
             followup_scheduler.start_scheduler()
@@ -202,7 +403,9 @@ class ScrapeRequest(BaseModel):
 @app.get("/", response_class=HTMLResponse, tags=["Web Interface"])
 async def home(request: Request):
     """Main landing page with streamlined interface"""
-    return templates.TemplateResponse("streamlined_form.html", {"request": request})
+    if templates.env.auto_reload:  # editing templates locally; always render fresh
+        return templates.TemplateResponse("streamlined_form.html", {"request": request})
+    return home_page.response(request)
 
 @app.post("/scrape-info", tags=["Web Interface"])
 async def scrape_info(request: ScrapeRequest):
@@ -213,7 +416,7 @@ async def scrape_info(request: ScrapeRequest):
         if not web_scraper:
             # Return fallback data instead of 503 error
             logger.warning("Web scraper not available - using fallback")
-            return JSONResponse({
+            return ORJSONResponse({
                 "success": True,
                 "web_info": {
                     'company_name': request.company or request.name,
@@ -230,7 +433,7 @@ async def scrape_info(request: ScrapeRequest):
             })
         
         if not request.name.strip():
-            return JSONResponse({
+            return ORJSONResponse({
                 "success": False,
                 "message": "Name is required"
             }, status_code=400)
@@ -251,7 +454,7 @@ async def scrape_info(request: ScrapeRequest):
             
             logger.info(f"✅ Scraping completed for {request.name} (fallback: {web_info.get('fallback_used', False)})")
             
-            return JSONResponse({
+            return ORJSONResponse({
                 "success": True,
                 "web_info": web_info,
                 "message": message
@@ -260,7 +463,7 @@ async def scrape_info(request: ScrapeRequest):
         except Exception as ex:
             logger.error(f"❌ Tavily scraping failed: {ex}")
             # Return structured fallback instead of error
-            return JSONResponse({
+            return ORJSONResponse({
                 "success": True,
                 "web_info": {
                     'company_name': request.company or request.name,
@@ -280,7 +483,7 @@ async def scrape_info(request: ScrapeRequest):
     except Exception as e:
         logger.error(f"❌ Endpoint error: {e}")
         # Even in worst case, return fallback data instead of 500
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "web_info": {
                 'company_name': getattr(request, 'company', None) or getattr(request, 'name', 'Unknown'),
@@ -336,7 +539,7 @@ async def debug_init_test():
     
     # Test Tavily initialization
     try:
-        tavily_api_key = os.getenv("TAVILY_API_KEY")
+        tavily_api_key = TAVILY_API_KEY
         if tavily_api_key:
             from tavily_direct import create_scraper
             test_scraper = create_scraper(tavily_api_key)
@@ -348,7 +551,7 @@ async def debug_init_test():
     
     # Test Gemini initialization
     try:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
+        gemini_api_key = GEMINI_API_KEY
         if gemini_api_key:
             from chatbot import create_chatbot
             test_chatbot = create_chatbot()
@@ -360,7 +563,7 @@ async def debug_init_test():
     
     # Test Email initialization
     try:
-        sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
+        sendgrid_api_key = SENDGRID_API_KEY
         if sendgrid_api_key:
             from email_service import create_email_service
             from ocr import supabase
@@ -421,7 +624,7 @@ async def debug_imports():
 @app.get("/debug/services", tags=["Debug"])
 async def debug_services():
     """Debug endpoint to check service initialization status"""
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    gemini_api_key = GEMINI_API_KEY
     
     return {
         "web_scraper": {
@@ -441,8 +644,8 @@ async def debug_services():
             "gemini_api_key_set": bool(gemini_api_key),
             "gemini_key_length": len(gemini_api_key) if gemini_api_key else 0,
             "gemini_key_prefix": gemini_api_key[:10] + "..." if gemini_api_key else None,
-            "tavily_api_key_set": bool(os.getenv("TAVILY_API_KEY")),
-            "sendgrid_api_key_set": bool(os.getenv("SENDGRID_API_KEY"))
+            "tavily_api_key_set": bool(TAVILY_API_KEY),
+            "sendgrid_api_key_set": bool(SENDGRID_API_KEY)
         }
     }
 
@@ -499,51 +702,27 @@ async def debug_tavily_search(q: str = "OpenAI", max_results: int = 2):
         # Run the blocking request in a thread
         result = await asyncio.to_thread(web_scraper.search, q, max_results)
 
-        return JSONResponse({"success": True, "query": q, "results_count": len(result.get('results', [])), "result": result})
+        return ORJSONResponse({"success": True, "query": q, "results_count": len(result.get('results', [])), "result": result})
     except Exception as e:
-        import traceback
         tb = traceback.format_exc()
         logger.error(f"❌ Debug Tavily search failed: {e}\n{tb}")
-        return JSONResponse({"success": False, "message": str(e), "trace": tb.splitlines()[-3:]}, status_code=500)
+        return ORJSONResponse({"success": False, "message": str(e), "trace": tb.splitlines()[-3:]}, status_code=500)
 
-# Process user information and redirect to chat
-@app.post("/process-info", tags=["Web Interface"])
-async def process_user_info(
-    name: str = Form(...),
-    company: str = Form(""),
-    email: str = Form(""),
-    phone: str = Form(""),
-    source: str = Form("manual")
-):
-    """
-    Process user information, perform web scraping, and redirect to chat
-    """
+async def _populate_session(session_id: str):
+    """Scrape web info and start the chat for a session created by /process-info"""
+    session_data = await session_store.get(session_id)
+    if session_data is None:
+        return
+    user_info = session_data["user_info"]
+    name = user_info["name"]
+    company = user_info["company"]
+    
     try:
-        # Create session ID
-        session_id = str(uuid.uuid4())
-        
-        # Basic user info
-        user_info = {
-            "name": name.strip(),
-            "company": company.strip(),
-            "email": email.strip(),
-            "phone": phone.strip(),
-            "source": source
-        }
-        
-        # Initialize session data
-        session_data = {
-            "user_info": user_info,
-            "web_info": None,
-            "chat_history": [],
-            "created_at": datetime.now().isoformat()
-        }
-        
         # Perform web scraping if available
-        if web_scraper and name.strip():
+        if web_scraper and name:
             try:
                 logger.info(f"🔍 Quick scraping information for {name}")
-                web_info = web_scraper.quick_user_summary(name, company if company else None)
+                web_info = await _scrape_once("quick_user_summary", name, company if company else None)
                 session_data["web_info"] = web_info
                 logger.info(f"✅ Quick web scraping completed for {name} (fallback: {web_info.get('fallback_used', False)})")
             except Exception as e:
@@ -579,34 +758,68 @@ async def process_user_info(
                 'source': 'no_scraper_fallback'
             }
         
-        # Store session
-        user_sessions[session_id] = session_data
-        
         # Generate initial AI greeting if chatbot is available
         if ai_chatbot:
             try:
-                context = {
-                    "business_card": user_info,
-                    "web_info": session_data.get("web_info")
-                }
+                context = await _chat_context(session_id, session_data)
                 
-                initial_message = f"Hello! I've gathered information about {name}"
-                if company:
-                    initial_message += f" from {company}"
-                initial_message += ". How can I help you with networking and professional insights?"
+                initial_message = GREETINGS[("manual", bool(company))].format(name=name, company=company)
                 
                 # Create chat session
                 ai_chatbot.create_session(session_id, context)
                 
                 # Add initial greeting to chat history
-                session_data["chat_history"].append({
+                await session_store.append_message(session_id, {
                     "role": "assistant",
                     "content": initial_message,
-                    "timestamp": datetime.now().isoformat()
-                })
+                    "timestamp": _now_iso()
+                }, left=True)
                 
             except Exception as e:
                 logger.error(f"❌ Error initializing chat: {e}")
+    finally:
+        session_data["status"] = "ready"
+        await session_store.update(
+            session_id,
+            web_info=session_data.get("web_info"),
+            status="ready"
+        )
+
+# Process user information and redirect to chat
+@app.post("/process-info", tags=["Web Interface"])
+async def process_user_info(
+    background_tasks: BackgroundTasks,
+    name: str = Form(...),
+    company: str = Form(""),
+    email: str = Form(""),
+    phone: str = Form(""),
+    source: str = Form("manual")
+):
+    """
+    Process user information and redirect to chat; web scraping and chat
+    setup finish in the background while the chat page polls /api/session
+    """
+    try:
+        # Create session ID
+        session_id = secrets.token_urlsafe(16)
+        
+        # Basic user info
+        user_info = {
+            "name": name.strip(),
+            "company": company.strip(),
+            "email": email.strip(),
+            "phone": phone.strip(),
+            "source": source
+        }
+        
+        # Store session before scraping so the chat page can load right away
+        await session_store.create(session_id, {
+            "user_info": user_info,
+            "web_info": None,
+            "created_at": _now_iso(),
+            "status": "scraping"
+        })
+        background_tasks.add_task(_populate_session, session_id)
         
         # Redirect to chat interface
         return RedirectResponse(url=f"/chat/{session_id}", status_code=303)
@@ -625,49 +838,45 @@ async def extract_card(
     Extract information from business card image and return JSON response
     """
     try:
-        from PIL import Image
-        import io
-        import base64
-        
         # Handle both file upload and camera capture
         if file is not None:
             # File upload
             if not file.content_type.startswith("image/"):
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=400,
                     content={"success": False, "error": "File must be an image"}
                 )
             
-            contents = await file.read()
-            image = Image.open(io.BytesIO(contents))
+            image = _open_upload(file)
             
         elif camera_image is not None:
             # Camera capture (base64 encoded)
             try:
-                # Remove data URL prefix if present
-                if camera_image.startswith('data:'):
-                    camera_image = camera_image.split(',')[1]
-                
-                image_data = base64.b64decode(camera_image)
-                image = Image.open(io.BytesIO(image_data))
+                # Strip data URL prefix (if present) without copying the payload
+                raw = camera_image.encode("ascii")
+                comma = raw.find(b",") if raw.startswith(b"data:") else -1
+                image_data = binascii.a2b_base64(memoryview(raw)[comma + 1:])
+                if len(image_data) > MAX_UPLOAD or not looks_like_image(image_data):
+                    raise ValueError("camera payload is not a supported image")
+                image = open_card_image(image_data)
             except Exception as e:
                 logger.error(f"Failed to decode camera image: {e}")
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=400,
                     content={"success": False, "error": "Invalid camera image data"}
                 )
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"success": False, "error": "No image provided"}
             )
         
         # Extract OCR fields
         logger.info("🔍 Extracting OCR from business card")
-        ocr_fields = extract_fields_with_llama(image)
+        ocr_fields = await _run_ocr(image)
         
         # Return extracted fields
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "fields": {
                 "name": ocr_fields.get("name", ""),
@@ -677,9 +886,14 @@ async def extract_card(
             }
         })
         
+    except HTTPException as http_error:
+        return ORJSONResponse(
+            status_code=http_error.status_code,
+            content={"success": False, "error": http_error.detail}
+        )
     except Exception as e:
         logger.error(f"❌ OCR extraction failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"success": False, "error": f"OCR extraction failed: {str(e)}"}
         )
@@ -691,20 +905,16 @@ async def upload_business_card(file: UploadFile = File(...)):
     Upload and process business card, then redirect to chat
     """
     try:
-        from PIL import Image
-        import io
-        
         # Validate file
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        # Read and process image
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
+        # Validate and open image
+        image = _open_upload(file)
         
         # Extract OCR fields
         logger.info("🔍 Extracting OCR from business card")
-        ocr_fields = extract_fields_with_llama(image)
+        ocr_fields = await _run_ocr(image)
         
         # Process the extracted information
         if ocr_fields.get("name") and ocr_fields["name"] != "Not Found":
@@ -718,22 +928,39 @@ async def upload_business_card(file: UploadFile = File(...)):
             }
             
             # Create session and process
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_urlsafe(16)
             session_data = {
                 "user_info": form_data,
                 "ocr_fields": ocr_fields,
                 "web_info": None,
-                "chat_history": [],
-                "created_at": datetime.now().isoformat()
+                "created_at": _now_iso()
             }
             
-            # Perform web scraping
+            # Start web scraping in a worker thread
+            scrape_task = None
             if web_scraper:
+                scrape_task = asyncio.create_task(_scrape_once(
+                    "get_comprehensive_info_async",
+                    form_data["name"],
+                    form_data["company"] if form_data["company"] else None
+                ))
+            
+            # Set up the chat session while scraping runs; web info is added once it arrives
+            chat_session = None
+            if ai_chatbot:
                 try:
-                    web_info = web_scraper.get_comprehensive_info(
-                        form_data["name"], 
-                        form_data["company"] if form_data["company"] else None
-                    )
+                    chat_session = ai_chatbot.create_session(session_id, {
+                        "business_card": form_data,
+                        "ocr_fields": ocr_fields,
+                        "web_info": None
+                    })
+                except Exception as e:
+                    logger.error(f"❌ Error initializing chat: {e}")
+            
+            # Collect web scraping results
+            if scrape_task:
+                try:
+                    web_info = await scrape_task
                     session_data["web_info"] = web_info
                     logger.info(f"✅ Web scraping completed for OCR (fallback: {web_info.get('fallback_used', False)})")
                 except Exception as e:
@@ -769,28 +996,21 @@ async def upload_business_card(file: UploadFile = File(...)):
                 }
             
             # Store session
-            user_sessions[session_id] = session_data
+            session_data = await session_store.create(session_id, session_data)
             
-            # Initialize chat
-            if ai_chatbot:
+            # Finish chat initialization
+            if chat_session:
                 try:
-                    context = {
-                        "business_card": form_data,
-                        "ocr_fields": ocr_fields,
-                        "web_info": session_data.get("web_info")
-                    }
+                    chat_session.context.update(await _chat_context(session_id, session_data))
                     
-                    ai_chatbot.create_session(session_id, context)
-                    
-                    initial_message = f"I've analyzed the business card for {form_data['name']}"
-                    if form_data['company']:
-                        initial_message += f" from {form_data['company']}"
-                    initial_message += ". I've also gathered additional information from the web. What would you like to know?"
+                    initial_message = GREETINGS[("ocr", bool(form_data["company"]))].format(
+                        name=form_data["name"], company=form_data["company"]
+                    )
                     
-                    session_data["chat_history"].append({
+                    await session_store.append_message(session_id, {
                         "role": "assistant",
                         "content": initial_message,
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": _now_iso()
                     })
                     
                 except Exception as e:
@@ -799,27 +1019,24 @@ async def upload_business_card(file: UploadFile = File(...)):
             return RedirectResponse(url=f"/chat/{session_id}", status_code=303)
         else:
             # OCR failed to extract name
-            return JSONResponse({
+            return ORJSONResponse({
                 "success": False,
                 "message": "Could not extract name from business card. Please try a clearer image or enter information manually.",
                 "ocr_fields": ocr_fields
             }, status_code=400)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error processing business card: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Chat interface
 @app.get("/chat/{session_id}", response_class=HTMLResponse, tags=["Web Interface"])
-async def chat_interface(request: Request, session_id: str):
+async def chat_interface(request: Request, session_id: str, session_data: Dict = Depends(get_session_or_404)):
     """
     Chat interface with profile summary sidebar
     """
-    if session_id not in user_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session_data = user_sessions[session_id]
-    
     return templates.TemplateResponse("chat_interface.html", {
         "request": request,
         "session_id": session_id,
@@ -837,7 +1054,7 @@ async def test_chat():
             return {
                 "status": "error",
                 "message": "AI chatbot not initialized",
-                "gemini_api_key_configured": bool(os.getenv('GEMINI_API_KEY'))
+                "gemini_api_key_configured": bool(GEMINI_API_KEY)
             }
         
         # Test chat generation
@@ -860,88 +1077,186 @@ async def test_chat():
             "status": "error",
             "message": "Chat test failed",
             "error": str(e),
-            "gemini_api_key_configured": bool(os.getenv('GEMINI_API_KEY'))
+            "gemini_api_key_configured": bool(GEMINI_API_KEY)
         }
 
 # Chat API endpoint
 @app.post("/api/chat", tags=["API"])
-async def send_chat_message(request: ChatRequest):
+async def send_chat_message(request: ChatRequest, response: Response):
     """
     Send message to AI chatbot
+
+    Duplicate requests (double-clicks, retries) for the same session and
+    message that arrive while it is being answered share one reply instead
+    of triggering another LLM call, and repeated questions about the same
+    profile are served from the response cache (reported in the X-Cache
+    header).
     """
+    key = hashlib.sha256(f"{request.session_id}\0{request.message}".encode()).hexdigest()
+    pending = inflight_chats.get(key)
+    if pending is not None:
+        logger.info(f"♻️ Reusing in-flight reply for session {request.session_id}")
+        result = await asyncio.shield(pending)
+        response.headers["X-Cache"] = "HIT" if result.get("cached") else "MISS"
+        return result
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    inflight_chats[key] = future
+    try:
+        async with _session_lock(request.session_id):
+            result = await _generate_chat_reply(request)
+        future.set_result(result)
+        response.headers["X-Cache"] = "HIT" if result.get("cached") else "MISS"
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved so asyncio does not log it
+        future.exception()
+        raise
+    finally:
+        if not future.done():
+            # The owner was cancelled (client disconnect); duplicates waiting on
+            # this reply get a regular error rather than a CancelledError
+            future.set_exception(RuntimeError("chat reply cancelled"))
+            future.exception()
+        # Only concurrent duplicates share a reply; a later resend is a new message
+        inflight_chats.pop(key, None)
+
+async def _generate_chat_reply(request: ChatRequest) -> Dict[str, Any]:
+    """Append the user message, generate the AI reply and record it in the session"""
     try:
         if not ai_chatbot:
             raise HTTPException(status_code=503, detail="AI chatbot not available")
         
-        if request.session_id not in user_sessions:
-            # Auto-create session if it doesn't exist
-            user_sessions[request.session_id] = {
-                "user_info": {
-                    "name": "Guest User",
-                    "company": "Unknown",
-                    "email": "guest@example.com",
-                    "phone": "Unknown"
-                },
-                "chat_history": [],
-                "created_at": datetime.now().isoformat()
-            }
-            logger.info(f"🔄 Auto-created session {request.session_id}")
-        
-        session_data = user_sessions[request.session_id]
+        session_data = await _ensure_session(request.session_id)
         
         # Add user message to history
-        session_data["chat_history"].append({
+        await session_store.append_message(request.session_id, {
             "role": "user",
             "content": request.message,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
         
         # Get context
-        context = {
-            "business_card": session_data["user_info"],
-            "web_info": session_data.get("web_info")
-        }
-        if "ocr_fields" in session_data:
-            context["ocr_fields"] = session_data["ocr_fields"]
+        context = await _chat_context(request.session_id, session_data)
         
-        # Generate AI response
-        response_data = ai_chatbot.generate_response(
-            request.session_id,
-            request.message,
-            context
-        )
+        # Reuse a cached reply for the same question about the same profile
+        cache_key = ResponseCache.make_key(request.message, session_data["chat_context_digest"])
+        cached_reply = response_cache.get(cache_key)
+        if cached_reply is not None:
+            response_data = {"success": True, "response": cached_reply}
+        else:
+            # Generate AI response (a blocking Gemini call, kept off the event loop)
+            response_data = await asyncio.to_thread(
+                ai_chatbot.generate_response,
+                request.session_id,
+                request.message,
+                context
+            )
+            if response_data.get("success") and not response_data.get("fallback_used"):
+                response_cache.set(cache_key, response_data["response"])
         
         if response_data.get("success"):
             # Add AI response to history
-            session_data["chat_history"].append({
+            await session_store.append_message(request.session_id, {
                 "role": "assistant",
                 "content": response_data["response"],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             return {
                 "success": True,
                 "response": response_data["response"],
-                "timestamp": datetime.now().isoformat()
+                "cached": cached_reply is not None,
+                "timestamp": _now_iso()
             }
         else:
             return {
                 "success": False,
                 "response": "Sorry, I encountered an error. Please try again.",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
             
     except Exception as e:
-        logger.error(f"❌ Chat error: {e}")
-        # Add more detailed error logging
-        import traceback
-        logger.error(f"❌ Chat error traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Chat error: {e}", exc_info=True)
         return {
             "success": False,
             "response": f"Sorry, I encountered an error: {str(e)}. Please try again.",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
 
+def _last_reply_is_cacheable(session_id: str) -> bool:
+    """
+    Whether the chatbot's latest streamed reply is complete Gemini output;
+    canned fallbacks and replies cut short by an error are never cached
+    """
+    session = ai_chatbot.get_session(session_id)
+    if not session or not session.messages:
+        return False
+    metadata = session.messages[-1].metadata or {}
+    return not (metadata.get("fallback_used") or metadata.get("interrupted"))
+
+# Streaming chat API endpoint
+@app.get("/api/chat/stream", tags=["API"])
+async def stream_chat_message(session_id: str, message: str):
+    """
+    Stream AI chatbot response as Server-Sent Events
+    """
+    if not ai_chatbot:
+        raise HTTPException(status_code=503, detail="AI chatbot not available")
+
+    async def event_stream():
+        # Same per-session lock as POST /api/chat, held for the whole turn
+        async with _session_lock(session_id):
+            session_data = await _ensure_session(session_id)
+
+            # Add user message to history
+            await session_store.append_message(session_id, {
+                "role": "user",
+                "content": message,
+                "timestamp": _now_iso()
+            })
+
+            # Get context
+            context = await _chat_context(session_id, session_data)
+
+            # Reuse a cached reply for the same question about the same profile
+            cache_key = ResponseCache.make_key(message, session_data["chat_context_digest"])
+            cached_reply = response_cache.get(cache_key)
+
+            parts = []
+            try:
+                if cached_reply is not None:
+                    parts.append(cached_reply)
+                    yield f"data: {orjson.dumps({'delta': cached_reply}).decode()}\n\n"
+                else:
+                    # The Gemini stream blocks, so it is read from the threadpool
+                    async for delta in iterate_in_threadpool(ai_chatbot.stream_response(session_id, message, context)):
+                        parts.append(delta)
+                        yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
+                    if _last_reply_is_cacheable(session_id):
+                        response_cache.set(cache_key, ''.join(parts))
+                done = {'timestamp': _now_iso(), 'cached': cached_reply is not None}
+                yield f"event: done\ndata: {orjson.dumps(done).decode()}\n\n"
+            except Exception as e:
+                logger.error(f"❌ Chat stream error: {e}")
+                yield f"event: error\ndata: {orjson.dumps({'error': str(e)}).decode()}\n\n"
+            finally:
+                # Add assembled AI response to history, even if the client disconnected
+                if parts:
+                    await session_store.append_message(session_id, {
+                        "role": "assistant",
+                        "content": ''.join(parts),
+                        "timestamp": _now_iso()
+                    })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/save", tags=["Web Interface"])
 async def save_card(
     name: str = Form(...),
@@ -967,9 +1282,8 @@ async def save_card(
             "company": company.strip()
         }
         
-        logger.info(f"Saving to Supabase: {data}")
-        result = supabase.table("business_cards").insert(data).execute()
-        card_id = result.data[0]['id']
+        logger.debug("Saving to Supabase: %s", data)
+        card_id = (await card_writer.submit(data))['id']
         logger.info(f"Successfully saved card with ID: {card_id}")
         
         # Send welcome email if email service is available and email is provided
@@ -992,7 +1306,7 @@ async def save_card(
             except Exception as e:
                 logger.error(f"❌ Email sending error: {e}")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True, 
             "message": "Business card saved successfully" + (" and welcome email sent" if email_sent else ""), 
             "data": {
@@ -1022,7 +1336,7 @@ async def save_web_info(
         
         # Parse the web info JSON
         try:
-            web_info_data = json.loads(web_info)
+            web_info_data = orjson.loads(web_info)
         except json.JSONDecodeError as e:
             raise HTTPException(status_code=400, detail=f"Invalid JSON in web_info: {str(e)}")
         
@@ -1031,15 +1345,15 @@ async def save_web_info(
             "name": name.strip(),
             "company": company.strip(),
             "web_info": web_info_data,
-            "created_at": datetime.now().isoformat()
+            "created_at": _now_iso()
         }
         
         logger.info(f"Saving web info to Supabase for {name}")
-        logger.info(f"Web info data: {web_info_data}")
+        logger.debug("Web info data: %s", web_info_data)
         result = supabase.table("web_scraped_data").insert(data).execute()
         logger.info(f"Successfully saved web info with ID: {result.data[0]['id']}")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True, 
             "message": "Web-scraped information saved successfully", 
             "data": {"id": result.data[0]['id']}
@@ -1049,10 +1363,7 @@ async def save_web_info(
         logger.error(f"HTTP error saving web info to Supabase: {http_error.detail}")
         raise
     except Exception as e:
-        logger.error(f"Error saving web info to Supabase: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(f"Error saving web info to Supabase ({type(e).__name__}): {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to save web info: {str(e)}")
 
 @app.post("/save-all", tags=["Web Interface"])
@@ -1082,23 +1393,27 @@ async def save_all(
             "company": company.strip()
         }
         
-        logger.info(f"Saving business card to Supabase: {card_data}")
-        
-        # Save business card first (required for ID)
-        card_result = supabase.table("business_cards").insert(card_data).execute()
-        card_id = card_result.data[0]['id']
-        logger.info(f"✅ Business card saved with ID: {card_id}")
+        logger.debug("Saving business card to Supabase: %s", card_data)
         
-        # Immediately return success to user while processing continues in background
-        import asyncio
+        # Save card and web info together in one transaction when possible
+        saved = await _save_card_and_web(card_data, web_info) if web_info.strip() else None
+        if saved:
+            card_id = saved["card_id"]
+            logger.info(f"✅ Business card and web info saved with IDs: {card_id}, {saved['web_id']}")
+        else:
+            # Save business card first (required for ID)
+            card_id = (await card_writer.submit(card_data))['id']
+            logger.info(f"✅ Business card saved with ID: {card_id}")
+            
+            # Start background task for web info (non-blocking)
+            asyncio.create_task(process_web_info_background(name, company, web_info, card_id))
         
-        # Start background tasks for web info and email (non-blocking)
-        asyncio.create_task(process_web_info_background(name, company, web_info, card_id))
+        # Immediately return success to user while email processing continues in background
         if email_service and email.strip():
             asyncio.create_task(send_welcome_email_background(email.strip(), name.strip(), company.strip(), card_id))
         
         # Return immediately - much faster response!
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True, 
             "message": "Business card saved successfully! Web scraping and email processing in progress...", 
             "data": {
@@ -1111,12 +1426,45 @@ async def save_all(
         logger.error(f"HTTP error saving to Supabase: {http_error.detail}")
         raise
     except Exception as e:
-        logger.error(f"Error saving to Supabase: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(f"Error saving to Supabase: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to save information: {str(e)}")
 
 
+# Set to False once the save_card_and_web function turns out to be missing
+save_card_rpc_available = True
+
+async def _save_card_and_web(card_data: Dict, web_info: str) -> Optional[Dict]:
+    """
+    Insert the business card and its web info in one round trip through the
+    save_card_and_web Postgres function (see README). Returns None when the
+    function is unavailable or web_info is not valid JSON, so the caller can
+    fall back to separate inserts.
+    """
+    global save_card_rpc_available
+    if not save_card_rpc_available:
+        return None
+    try:
+        web_info_data = orjson.loads(web_info)
+    except orjson.JSONDecodeError:
+        return None
+    
+    params = {
+        "p_name": card_data["name"],
+        "p_email": card_data["email"],
+        "p_phone": card_data["phone"],
+        "p_company": card_data["company"],
+        "p_web_info": web_info_data
+    }
+    try:
+        result = await asyncio.to_thread(lambda: supabase.rpc("save_card_and_web", params).execute())
+        return result.data[0]
+    except Exception as e:
+        # PGRST202: PostgREST could not find the function
+        if getattr(e, "code", None) == "PGRST202":
+            save_card_rpc_available = False
+        logger.warning(f"⚠️ save_card_and_web RPC failed, using separate inserts: {e}")
+        return None
+
 # Background task for web info processing
 async def process_web_info_background(name: str, company: str, web_info: str, card_id: int):
     """Process web info in background for faster response.
@@ -1127,12 +1475,12 @@ async def process_web_info_background(name: str, company: str, web_info: str, ca
         return
 
     try:
-        web_info_data = json.loads(web_info)
+        web_info_data = orjson.loads(web_info)
         web_data = {
             "name": name.strip(),
             "company": company.strip(),
             "web_info": web_info_data,
-            "created_at": datetime.now().isoformat()
+            "created_at": _now_iso()
         }
 
         logger.info(f"📊 Background: Saving web info for {name}")
@@ -1175,20 +1523,29 @@ async def send_welcome_email_background(email: str, name: str, company: str, car
             logger.warning(f"⚠️ Background: Failed to send email: {email_result['message']}")
             
     except Exception as e:
-        logger.error(f"❌ Background: Email sending error: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Background: Email sending error: {e}", exc_info=True)
 
 # Get session data API
 @app.get("/api/session/{session_id}", tags=["API"])
-async def get_session_data(session_id: str):
+async def get_session_data(
+    session_id: str,
+    offset: Optional[int] = Query(
+        None, ge=0, description="Index of the first chat message to return (default: the newest page)"
+    ),
+    limit: int = Query(50, ge=1, le=MAX_CHAT_HISTORY, description="Number of chat messages to return"),
+    session_data: Dict = Depends(get_session_or_404)
+):
     """
-    Get session data for profile display
+    Get session data for profile display, with a page of the chat history
     """
-    if session_id not in user_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    return user_sessions[session_id]
+    history = session_data["chat_history"]
+    if offset is None:
+        offset = max(len(history) - limit, 0)
+    return {
+        **session_data,
+        "chat_history": list(itertools.islice(history, offset, offset + limit)),
+        "chat_history_total": len(history)
+    }
 
 # Quick status endpoint to check background processing
 @app.get("/api/status/{card_id}", tags=["API"])
@@ -1212,7 +1569,7 @@ async def get_processing_status(card_id: int):
             .eq("business_card_id", card_id)\
             .execute()
         
-        return JSONResponse({
+        return ORJSONResponse({
             "card_id": card_id,
             "web_info_processed": len(web_info_result.data) > 0,
             "email_sent": len(email_result.data) > 0,
@@ -1221,9 +1578,11 @@ async def get_processing_status(card_id: int):
         
     except Exception as e:
         logger.error(f"Error checking status: {e}")
-        return JSONResponse({"status": "error", "message": str(e)})
+        return ORJSONResponse({"status": "error", "message": str(e)})
 
 # Bulk email endpoint
+BULK_EMAIL_PAGE_SIZE = 500  # contacts fetched from Supabase per page
+
 @app.post("/api/send-bulk-emails", tags=["API"])
 async def send_bulk_emails(api_key: str = Depends(verify_api_key)):
     """
@@ -1237,26 +1596,39 @@ async def send_bulk_emails(api_key: str = Depends(verify_api_key)):
         if not supabase:
             raise HTTPException(status_code=503, detail="Database not available")
         
-        # Fetch all contacts with emails
-        result = supabase.table("business_cards")\
-            .select("name, email, company")\
-            .not_.is_("email", "null")\
-            .neq("email", "")\
-            .execute()
-        
-        contacts = result.data
+        # Fetch contacts with emails one page at a time and send each page as it arrives
+        results = {"total": 0, "sent": 0, "failed": 0, "details": []}
+        offset = 0
+        while True:
+            page = await asyncio.to_thread(
+                lambda start=offset: supabase.table("business_cards")
+                    .select("name, email, company")
+                    .not_.is_("email", "null")
+                    .neq("email", "")
+                    .order("id")
+                    .range(start, start + BULK_EMAIL_PAGE_SIZE - 1)
+                    .execute()
+            )
+            contacts = page.data
+            if not contacts:
+                break
+            
+            page_results = await email_service.send_batch_emails_async(contacts, concurrency=20)
+            for field in ("total", "sent", "failed", "details"):
+                results[field] += page_results[field]
+            
+            if len(contacts) < BULK_EMAIL_PAGE_SIZE:
+                break
+            offset += BULK_EMAIL_PAGE_SIZE
         
-        if not contacts:
-            return JSONResponse({
+        if not results["total"]:
+            return ORJSONResponse({
                 "success": True,
                 "message": "No contacts with emails found",
                 "results": {"total": 0, "sent": 0, "failed": 0}
             })
         
-        # Send batch emails
-        results = email_service.send_batch_emails(contacts)
-        
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "message": f"Sent {results['sent']}/{results['total']} emails",
             "results": results
@@ -1280,37 +1652,46 @@ async def sendgrid_webhook(
         if not webhook_handler:
             raise HTTPException(status_code=503, detail="Webhook handler not available")
         
-        # Get raw request body
-        body = await request.body()
-        
-        # Verify webhook signature (optional but recommended)
+        # Verify webhook signature (optional but recommended) while the body streams in
+        signature_mac = None
         if x_twilio_email_event_webhook_signature and x_twilio_email_event_webhook_timestamp:
-            signature_valid = webhook_handler.verify_webhook_signature(
-                body, x_twilio_email_event_webhook_signature, x_twilio_email_event_webhook_timestamp
-            )
-            if not signature_valid:
+            try:
+                signature_mac = webhook_handler.start_signature_check(x_twilio_email_event_webhook_timestamp)
+            except Exception as e:
+                logger.error(f"❌ Webhook signature verification failed: {e}")
                 logger.warning("⚠️ Invalid webhook signature")
-                # Continue processing anyway for development
         
-        # Parse webhook events
-        events = webhook_handler.parse_webhook_events(body)
-        
-        # Process each event
-        results = []
-        for event in events:
-            result = await webhook_handler.process_webhook_event(event)
-            results.append(result)
+        # Parse events as the body streams in, processing them in bounded
+        # sub-batches (one tracking write per message) so a large delivery is
+        # never held in memory at once. The Supabase client blocks, so each
+        # sub-batch runs off the event loop.
+        results = None
+        processed_events = 0
+        batch = []
+        async for event in webhook_handler.parse_webhook_events_stream(request.stream(), signature_mac):
+            batch.append(event)
+            if len(batch) >= WEBHOOK_BATCH_SIZE:
+                results = await asyncio.to_thread(webhook_handler.process_webhook_events, batch, results)
+                processed_events += len(batch)
+                batch = []
+        if batch or results is None:
+            results = await asyncio.to_thread(webhook_handler.process_webhook_events, batch, results)
+            processed_events += len(batch)
+        
+        if signature_mac is not None and not webhook_handler.signature_matches(
+            signature_mac, x_twilio_email_event_webhook_signature
+        ):
+            logger.warning("⚠️ Invalid webhook signature")
+            # Continue processing anyway for development
         
         return {
             "success": True,
-            "processed_events": len(events),
+            "processed_events": processed_events,
             "results": results
         }
         
     except Exception as e:
-        logger.error(f"❌ Webhook processing error: {e}")
-        import traceback
-        logger.error(f"❌ Webhook error traceback: {traceback.format_exc()}")
+        logger.error(f"❌ Webhook processing error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Health check
@@ -1321,7 +1702,7 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _now_iso(),
         "services": {
             "web_scraper": web_scraper is not None,
             "ai_chatbot": ai_chatbot is not None,
@@ -1339,5 +1720,16 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    initialize_services()
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Without REDIS_URL sessions live in process memory, so keep one worker
+    # unless WEB_CONCURRENCY is set; with Redis every worker shares sessions.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        # uvloop/httptools when installed (uvicorn[standard]); asyncio/h11 otherwise, e.g. on Windows
+        loop="auto",
+        http="auto",
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
\ No newline at end of file
@@ -3,22 +3,28 @@ Business Card OCR Application with REST API
 Combines web interface and REST API endpoints with auto-capture feature
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import base64
+import hashlib
 import io
 import os
+import re
+import uuid
 from datetime import datetime
 from typing import Optional, List
 from dotenv import load_dotenv
+from cachetools import TTLCache
 from fastapi import FastAPI, Form, File, UploadFile, Request, HTTPException, Depends, status, Query, Header
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field, validator
 from supabase import create_client, Client
 from PIL import Image
+from batch_writer import create_batched_inserter
 import logging
 
 # Load environment variables
@@ -39,6 +45,11 @@ LLAMA_API_URL = os.getenv("LLAMA_API_URL")
 LLAMA_API_KEY = os.getenv("LLAMA_API_KEY")
 LLAMA_DEPLOYMENT_NAME = os.getenv("LLAMA_DEPLOYMENT_NAME", "Llama-3.2-11B-Vision-Instruct")
 
+# Optional Supabase Storage bucket: when set, the vision model fetches the card
+# through a short-lived signed URL instead of an inline base64 data URL
+OCR_IMAGE_BUCKET = os.getenv("OCR_IMAGE_BUCKET")
+OCR_IMAGE_URL_TTL = 60  # seconds
+
 # API Key for authentication (set this in .env for production)
 API_KEY = os.getenv("API_KEY", "your-secret-api-key-change-this-in-production")
 
@@ -54,6 +65,9 @@ else:
         logger.error(f"Failed to initialize Supabase client: {e}")
         supabase = None
 
+# Card inserts from concurrent requests share one PostgREST call
+card_writer = create_batched_inserter(supabase, "business_cards")
+
 # Llama API headers
 if LLAMA_API_URL and LLAMA_API_KEY:
     headers = {
@@ -64,6 +78,61 @@ else:
     logger.error("Llama API credentials not found")
     headers = None
 
+# Request pieces that are identical for every card; only the image is added per call
+LLAMA_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an OCR assistant that extracts structured business card details. Always respond with valid JSON only."
+}
+LLAMA_PROMPT_PART = {
+    "type": "text",
+    "text": """Extract the following fields from this business card image:
+- name (full name of the person)
+- email (email address)
+- phone (phone number)
+- company (company/organization name)
+
+Respond ONLY with a JSON object in this exact format:
+{"name": "...", "email": "...", "phone": "...", "company": "..."}
+
+If a field is not found, use an empty string."""
+}
+LLAMA_PAYLOAD_BASE = {
+    "temperature": 0.1,
+    "max_tokens": 500,
+    "model": LLAMA_DEPLOYMENT_NAME if LLAMA_API_URL and "azure.com" in LLAMA_API_URL else "Llama-3.2-11B-Vision-Instruct"
+}
+
+# Gateway errors from the Llama endpoint are retried with exponential backoff;
+# the transport's own retries only cover failed connection attempts
+LLAMA_RETRY_STATUSES = frozenset({502, 503, 504})
+LLAMA_STATUS_RETRIES = 2
+LLAMA_RETRY_BACKOFF = 0.2  # seconds before the first retry, doubling after
+
+# Pooled keep-alive client, created on first use inside the running event loop
+_llama_client: Optional[httpx.AsyncClient] = None
+
+def get_llama_client() -> httpx.AsyncClient:
+    """Return the shared async client for the Llama endpoint"""
+    global _llama_client
+    if _llama_client is None:
+        _llama_client = httpx.AsyncClient(
+            headers=headers or {},
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # Pool limits belong to the transport; httpx ignores the client's when one is given
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        )
+    return _llama_client
+
+async def close_llama_client():
+    """Release the Llama client's pooled connections"""
+    global _llama_client
+    if _llama_client is not None:
+        await _llama_client.aclose()
+        _llama_client = None
+
 # -----------------------------
 # FastAPI setup
 # -----------------------------
@@ -72,7 +141,8 @@ app = FastAPI(
     description="Extract and manage business card information using AI-powered OCR with auto-capture",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for API access
@@ -87,6 +157,27 @@ app.add_middleware(
 templates = Jinja2Templates(directory="templates")
 security = HTTPBearer()
 
+class StaticPage:
+    """A template with no per-request content, rendered once and served with an ETag"""
+
+    def __init__(self, templates: Jinja2Templates, name: str, cache_control: str = "public, max-age=3600"):
+        self.templates = templates
+        self.name = name
+        self.cache_control = cache_control
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+
+    def response(self, request: Request) -> Response:
+        if self._body is None:
+            self._body = self.templates.get_template(self.name).render(request=request).encode("utf-8")
+            self._etag = f'"{hashlib.blake2b(self._body, digest_size=16).hexdigest()}"'
+        headers = {"Cache-Control": self.cache_control, "ETag": self._etag}
+        if request.headers.get("if-none-match") == self._etag:
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(self._body, headers=headers)
+
+home_page = StaticPage(templates, "form.html")
+
 # -----------------------------
 # Pydantic Models for API
 # -----------------------------
@@ -168,98 +259,232 @@ def verify_api_key_header(x_api_key: str = Header(None)) -> str:
 # -----------------------------
 # Helper Functions
 # -----------------------------
-def encode_image(image: Image.Image, max_size: tuple = (1024, 1024)) -> str:
-    """Encode image to base64 with optional resizing"""
+OCR_MAX_IMAGE_SIZE = (768, 768)  # Llama 3.2 Vision tiles at 560px, so more resolution is wasted
+OCR_JPEG_QUALITY = 70  # card text stays legible; 4:2:0 chroma keeps the payload small
+JPEG_PASSTHROUGH_BYTES = 400_000  # small JPEGs that already fit are sent without re-encoding
+
+# Optional ```json ... ``` fence around the model's reply
+CODE_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$", re.S)
+
+# Parsed fields of recently scanned cards, keyed by a hash of the encoded JPEG
+OCR_RESULT_CACHE_TTL = 60 * 60  # seconds
+ocr_result_cache: TTLCache = TTLCache(maxsize=512, ttl=OCR_RESULT_CACHE_TTL)
+
+# Upload limits for business card images
+MAX_UPLOAD = 10 * 1024 * 1024  # 10 MB
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG", b"GIF8")
+
+def looks_like_image(data: bytes) -> bool:
+    """Cheap magic-byte check so garbage never reaches the PIL decoder"""
+    # WebP is a RIFF container; WAV, AVI and friends share the RIFF prefix
+    return data.startswith(IMAGE_SIGNATURES) or (data[:4] == b"RIFF" and data[8:12] == b"WEBP")
+
+async def read_card_upload(file: UploadFile, limit: int = MAX_UPLOAD) -> Image.Image:
+    """Read an upload of at most limit bytes, check its magic bytes and open it"""
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail=f"File too large (max {limit // (1024 * 1024)} MB)")
+    raw = await file.read(limit + 1)
+    if len(raw) > limit:
+        raise HTTPException(status_code=413, detail=f"File too large (max {limit // (1024 * 1024)} MB)")
+    if not looks_like_image(raw):
+        raise HTTPException(status_code=400, detail="File must be a JPEG, PNG, GIF or WebP image")
+    return open_card_image(raw)
+
+def open_card_image(data) -> Image.Image:
+    """Open uploaded image bytes or a binary file; large JPEGs are decoded straight at reduced scale"""
+    image = Image.open(io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data)
+    if image.format == "JPEG":
+        if image.mode == "RGB" and image.size[0] <= OCR_MAX_IMAGE_SIZE[0] and image.size[1] <= OCR_MAX_IMAGE_SIZE[1]:
+            # Already the right size and colorspace, so encode_image may reuse the upload's bytes
+            image.info["ocr_passthrough"] = True
+        # libjpeg scales by 1/2, 1/4 or 1/8 while decoding, never below the OCR size
+        image.draft("RGB", OCR_MAX_IMAGE_SIZE)
+    return image
+
+def _passthrough_jpeg(image: Image.Image) -> Optional[bytes]:
+    """Return the original upload bytes of a small JPEG that needs no resizing, without decoding it"""
+    if not image.info.get("ocr_passthrough") or image.fp is None:
+        return None
+    image.fp.seek(0)
+    raw = image.fp.read(JPEG_PASSTHROUGH_BYTES + 1)
+    return raw if len(raw) <= JPEG_PASSTHROUGH_BYTES else None
+
+def encode_jpeg(image: Image.Image, max_size: tuple = OCR_MAX_IMAGE_SIZE) -> bytes:
+    """Encode image to JPEG bytes with optional resizing"""
     try:
         if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            image.thumbnail(max_size, Image.Resampling.BILINEAR)
             logger.info(f"Image resized to {image.size}")
+        else:
+            raw = _passthrough_jpeg(image)
+            if raw is not None:
+                return raw
         
         buffer = io.BytesIO()
         if image.mode == 'RGBA':
             image = image.convert('RGB')
-        image.save(buffer, format="JPEG", quality=85)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        image.save(buffer, format="JPEG", quality=OCR_JPEG_QUALITY, subsampling=2, optimize=True)
+        return buffer.getvalue()
     except Exception as e:
         logger.error(f"Error encoding image: {e}")
         raise HTTPException(status_code=400, detail="Failed to process image")
 
-def extract_fields_with_llama(image: Image.Image) -> dict:
+def encode_image(image: Image.Image, max_size: tuple = OCR_MAX_IMAGE_SIZE) -> str:
+    """Encode image to base64 with optional resizing"""
+    return base64.b64encode(encode_jpeg(image, max_size)).decode("utf-8")
+
+def _upload_card_image(jpeg: bytes) -> str:
+    """Store the card JPEG in OCR_IMAGE_BUCKET and return its storage path"""
+    path = f"{uuid.uuid4().hex}.jpg"
+    supabase.storage.from_(OCR_IMAGE_BUCKET).upload(path, jpeg, {"content-type": "image/jpeg"})
+    return path
+
+def _signed_image_url(path: str) -> str:
+    signed = supabase.storage.from_(OCR_IMAGE_BUCKET).create_signed_url(path, OCR_IMAGE_URL_TTL)
+    return signed.get("signedURL") or signed["signedUrl"]
+
+def _delete_card_image(path: str):
+    try:
+        supabase.storage.from_(OCR_IMAGE_BUCKET).remove([path])
+    except Exception as e:
+        logger.warning(f"Failed to delete OCR image {path}: {e}")
+
+async def _image_url(jpeg: bytes):
+    """
+    Return (url, storage_path) for the vision request: a short-lived signed
+    Storage URL when OCR_IMAGE_BUCKET is configured, otherwise an inline data URL
+    """
+    if OCR_IMAGE_BUCKET and supabase:
+        path = None
+        try:
+            path = await asyncio.to_thread(_upload_card_image, jpeg)
+            return await asyncio.to_thread(_signed_image_url, path), path
+        except Exception as e:
+            logger.warning(f"OCR image upload failed, sending it inline: {e}")
+            if path:
+                await asyncio.to_thread(_delete_card_image, path)
+    return f"data:image/jpeg;base64,{base64.b64encode(jpeg).decode('utf-8')}", None
+
+def warm_up_image_pipeline():
+    """Load Pillow's codec plugins at startup so the first scan doesn't pay for it"""
+    buffer = io.BytesIO()
+    # Big enough to go through the resize and re-encode path rather than passthrough
+    Image.new("RGB", (2400, 1600), "white").save(buffer, format="JPEG")
+    encode_image(open_card_image(buffer.getvalue()))
+
+async def warm_up_llama_connection():
+    """Open a pooled TLS connection to the Llama endpoint so the first scan skips the handshake"""
+    if not headers:
+        return
+    try:
+        await get_llama_client().head(LLAMA_API_URL)
+    except httpx.HTTPError as e:
+        logger.warning(f"Llama API warm-up failed: {e}")
+
+async def _stream_completion(payload: dict) -> str:
+    """
+    Stream the completion and stop reading as soon as the reply's JSON object
+    is closed, so trailing filler never has to be generated and sent.
+    Endpoints that answer with a plain JSON body are read in full, and
+    502/503/504 responses are retried with backoff.
+    """
+    body = orjson.dumps({**payload, "stream": True})
+    for attempt in range(LLAMA_STATUS_RETRIES + 1):
+        async with get_llama_client().stream("POST", LLAMA_API_URL, content=body) as response:
+            # The extraction POST has no side effects, so gateway errors are safe to retry
+            if response.status_code not in LLAMA_RETRY_STATUSES or attempt == LLAMA_STATUS_RETRIES:
+                return await _read_completion(response)
+        delay = LLAMA_RETRY_BACKOFF * 2 ** attempt
+        logger.warning(f"⚠️ Llama API returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def _read_completion(response: httpx.Response) -> str:
+    """Read the reply's content from a completion response, streamed or not"""
+    if response.status_code >= 400:
+        await response.aread()
+        response.raise_for_status()
+    if not response.headers.get("content-type", "").startswith("text/event-stream"):
+        result = orjson.loads(await response.aread())
+        return result["choices"][0]["message"]["content"]
+
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        choices = orjson.loads(data).get("choices")
+        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+        if not delta:
+            continue
+        for i, char in enumerate(delta):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = depth > 0
+            elif char == "{":
+                depth += 1
+            elif char == "}" and depth:
+                depth -= 1
+                if not depth:
+                    # Leaving the block closes the response and aborts the stream
+                    parts.append(delta[:i + 1])
+                    return "".join(parts)
+        parts.append(delta)
+    return "".join(parts)
+
+async def extract_fields_with_llama(image: Image.Image) -> dict:
     """Extract business card fields using Llama Vision API"""
     try:
         if not headers:
             raise HTTPException(status_code=503, detail="OCR service not configured")
         
-        b64_img = encode_image(image)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": "You are an OCR assistant that extracts structured business card details. Always respond with valid JSON only."
-            },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": """Extract the following fields from this business card image:
-- name (full name of the person)
-- email (email address)
-- phone (phone number)
-- company (company/organization name)
-
-Respond ONLY with a JSON object in this exact format:
-{"name": "...", "email": "...", "phone": "...", "company": "..."}
-
-If a field is not found, use an empty string."""
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{b64_img}"
-                        }
-                    }
-                ]
-            }
-        ]
+        # Resizing and JPEG encoding are CPU work; keep them off the event loop
+        jpeg = await asyncio.to_thread(encode_jpeg, image)
+        # Re-submitting the same card is common (edits, retries); skip the model call
+        image_key = hashlib.blake2b(jpeg, digest_size=16).hexdigest()
+        cached = ocr_result_cache.get(image_key)
+        if cached is not None:
+            logger.info("Using cached OCR result")
+            return dict(cached)
+        image_url, stored_path = await _image_url(jpeg)
         
         payload = {
-            "messages": messages,
-            "temperature": 0.1,
-            "max_tokens": 500
+            **LLAMA_PAYLOAD_BASE,
+            "messages": [
+                LLAMA_SYSTEM_MESSAGE,
+                {
+                    "role": "user",
+                    "content": [
+                        LLAMA_PROMPT_PART,
+                        {"type": "image_url", "image_url": {"url": image_url}}
+                    ]
+                }
+            ]
         }
         
-        if "azure.com" in LLAMA_API_URL:
-            payload["model"] = LLAMA_DEPLOYMENT_NAME
-        else:
-            payload["model"] = "Llama-3.2-11B-Vision-Instruct"
-        
         logger.info("Sending request to Llama API...")
         
-        response = requests.post(
-            LLAMA_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        
-        response.raise_for_status()
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
+        try:
+            content = await _stream_completion(payload)
+        finally:
+            if stored_path:
+                asyncio.get_running_loop().run_in_executor(None, _delete_card_image, stored_path)
         
-        logger.info(f"Raw API response: {content}")
+        logger.debug("Raw API response: %s", content)
         
-        # Parse JSON from response
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        # Parse JSON from response, dropping any markdown code fence
+        content = CODE_FENCE_RE.match(content).group(1)
         
-        parsed_data = json.loads(content)
+        parsed_data = orjson.loads(content)
         
         fields = {
             "name": parsed_data.get("name", ""),
@@ -268,15 +493,16 @@ If a field is not found, use an empty string."""
             "company": parsed_data.get("company", "")
         }
         
-        logger.info(f"Extracted fields: {fields}")
-        return fields
+        logger.debug("Extracted fields: %s", fields)
+        ocr_result_cache[image_key] = fields
+        return dict(fields)
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"API request error: {e}")
-        if hasattr(e, 'response') and e.response is not None:
+        if isinstance(e, httpx.HTTPStatusError):
             logger.error(f"Response: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=503, detail="Failed to connect to OCR service")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"JSON parsing error: {e}")
         return {"name": "", "email": "", "phone": "", "company": ""}
     except Exception as e:
@@ -289,9 +515,9 @@ If a field is not found, use an empty string."""
 @app.get("/", response_class=HTMLResponse, tags=["Web Interface"])
 async def home(request: Request):
     """Display web interface for business card scanning"""
-    return templates.TemplateResponse("form.html", {"request": request})
+    return home_page.response(request)
 
-@app.post("/extract", response_class=JSONResponse, tags=["Web Interface"])
+@app.post("/extract", response_class=ORJSONResponse, tags=["Web Interface"])
 async def extract_card(
     file: Optional[UploadFile] = File(None),
     camera_image: Optional[str] = Form(None)
@@ -305,28 +531,31 @@ async def extract_card(
         
         if file:
             logger.info(f"Processing uploaded file: {file.filename}")
-            if not file.content_type.startswith('image/'):
-                raise HTTPException(status_code=400, detail="File must be an image")
-            image = Image.open(file.file)
+            image = await read_card_upload(file)
             
         elif camera_image:
             logger.info("Processing camera capture (auto or manual)")
+            # base64 inflates by 4/3, so oversized captures are refused before decoding
+            if len(camera_image) > MAX_UPLOAD * 4 // 3 + 1024:
+                raise HTTPException(status_code=413, detail="Camera image too large")
             if "," in camera_image:
                 image_data = base64.b64decode(camera_image.split(",")[1])
             else:
                 image_data = base64.b64decode(camera_image)
-            image = Image.open(io.BytesIO(image_data))
+            if not looks_like_image(image_data):
+                raise HTTPException(status_code=400, detail="Camera capture must be a JPEG, PNG, GIF or WebP image")
+            image = open_card_image(image_data)
         else:
             raise HTTPException(status_code=400, detail="No image provided")
         
-        fields = extract_fields_with_llama(image)
-        return JSONResponse({"success": True, "fields": fields})
+        fields = await extract_fields_with_llama(image)
+        return ORJSONResponse({"success": True, "fields": fields})
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error in extract_card: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -356,11 +585,11 @@ async def save_card(
             "company": company.strip()
         }
         
-        logger.info(f"Saving to Supabase: {data}")
-        result = supabase.table("business_cards").insert(data).execute()
+        logger.debug("Saving to Supabase: %s", data)
+        await card_writer.submit(data)
         logger.info(f"Successfully saved card")
         
-        return JSONResponse({"success": True, "message": "Business card saved successfully"})
+        return ORJSONResponse({"success": True, "message": "Business card saved successfully"})
         
     except HTTPException:
         raise
@@ -410,8 +639,8 @@ async def api_extract_business_card(
             )
         
         logger.info(f"API: Processing file {file.filename}")
-        image = Image.open(file.file)
-        fields = extract_fields_with_llama(image)
+        image = await read_card_upload(file)
+        fields = await extract_fields_with_llama(image)
         
         return OCRResponse(
             success=True,
@@ -456,12 +685,12 @@ async def api_create_card(
             "company": card.company.strip() if card.company else ""
         }
         
-        result = supabase.table("business_cards").insert(data).execute()
+        saved = await card_writer.submit(data)
         
         return APIResponse(
             success=True,
             message="Business card created successfully",
-            data={"id": result.data[0]["id"]}
+            data={"id": saved["id"]}
         )
         
     except HTTPException:
@@ -666,8 +895,8 @@ async def api_extract_and_save(
             raise HTTPException(status_code=503, detail="Database not available")
         
         # Extract
-        image = Image.open(file.file)
-        fields = extract_fields_with_llama(image)
+        image = await read_card_upload(file)
+        fields = await extract_fields_with_llama(image)
         
         # Validate minimum requirements
         if not fields.get("name") or not fields.get("name").strip():
@@ -684,13 +913,13 @@ async def api_extract_and_save(
             "company": fields.get("company", "").strip()
         }
         
-        result = supabase.table("business_cards").insert(data).execute()
+        saved = await card_writer.submit(data)
         
         return APIResponse(
             success=True,
             message="Business card extracted and saved successfully",
             data={
-                "id": result.data[0]["id"],
+                "id": saved["id"],
                 "extracted_fields": fields
             }
         )
@@ -701,23 +930,27 @@ async def api_extract_and_save(
         logger.error(f"Error in extract and save: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Legacy health check endpoint
+# Legacy health check endpoint; its configuration is fixed at import, so the
+# body is serialized once for load balancers that poll it
+HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "supabase_connected": supabase is not None,
+    "supabase_url": SUPABASE_URL if SUPABASE_URL else "Not configured",
+    "llama_api_configured": headers is not None,
+    "llama_api_url": LLAMA_API_URL if LLAMA_API_URL else "Not configured"
+})
+
 @app.get("/health", tags=["Web Interface"])
 async def health_check():
     """Legacy health check endpoint for web interface"""
-    return JSONResponse({
-        "status": "healthy",
-        "supabase_connected": supabase is not None,
-        "supabase_url": SUPABASE_URL if SUPABASE_URL else "Not configured",
-        "llama_api_configured": headers is not None,
-        "llama_api_url": LLAMA_API_URL if LLAMA_API_URL else "Not configured"
-    })
+    return Response(HEALTH_BODY, media_type="application/json")
 
 # -----------------------------
 # Startup Event
 # -----------------------------
 @app.on_event("startup")
 async def startup_event():
+    asyncio.create_task(warm_up_llama_connection())
     logger.info("=" * 50)
     logger.info("Starting Business Card OCR Application with Auto-Capture API")
     logger.info("=" * 50)
@@ -728,6 +961,10 @@ async def startup_event():
     logger.info(f"API Key: {'Configured' if API_KEY != 'your-secret-api-key-change-this-in-production' else 'USING DEFAULT - CHANGE IN PRODUCTION!'}")
     logger.info("=" * 50)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_llama_client()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Response Cache Module
+Caches chatbot replies so repeated questions about the same profile skip the
+LLM call: an in-process LRU (L1) backed by Redis (L2) when REDIS_URL is set
+"""
+
+import os
+import orjson
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the L1 cache works on its own
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_SIZE = 1024  # entries kept in the in-process LRU
+RESPONSE_CACHE_TTL = 4 * 60 * 60  # seconds a reply is reused from Redis
+
+
+class ResponseCache:
+    """Exact-match reply cache keyed on the normalized message and profile context"""
+
+    def __init__(self, redis_url: str = None, max_size: int = RESPONSE_CACHE_SIZE, ttl: int = RESPONSE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self.client = redis.Redis.from_url(redis_url, decode_responses=True) if redis_url and redis else None
+
+    @staticmethod
+    def context_digest(context: Optional[Dict] = None) -> str:
+        """Stable hash of a profile context; sessions compute it once and reuse it"""
+        profile = orjson.dumps(context or {}, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(profile).hexdigest()
+
+    @staticmethod
+    def make_key(message: str, context_digest: str) -> str:
+        """Hash of the whitespace/case-normalized message plus the profile context digest"""
+        normalized = " ".join(message.lower().split())
+        return hashlib.sha256(f"{normalized}\0{context_digest}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached reply, checking the local LRU before Redis"""
+        reply = self._local.get(key)
+        if reply is not None:
+            self._local.move_to_end(key)
+            return reply
+        if self.client is not None:
+            try:
+                reply = self.client.get(f"chat:exact:{key}")
+            except Exception as e:
+                logger.warning(f"⚠️ Response cache lookup failed: {e}")
+                return None
+            if reply is not None:
+                self._remember(key, reply)
+        return reply
+
+    def set(self, key: str, reply: str) -> None:
+        """Store a reply in both cache levels"""
+        self._remember(key, reply)
+        if self.client is not None:
+            try:
+                self.client.setex(f"chat:exact:{key}", self.ttl, reply)
+            except Exception as e:
+                logger.warning(f"⚠️ Response cache write failed: {e}")
+
+    def _remember(self, key: str, reply: str) -> None:
+        self._local[key] = reply
+        self._local.move_to_end(key)
+        if len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+
+def create_response_cache(redis_url: str = None) -> ResponseCache:
+    """
+    Create the chat response cache
+
+    Args:
+        redis_url: Redis connection URL for the shared L2 cache (defaults to REDIS_URL env var)
+
+    Returns:
+        ResponseCache instance
+    """
+    return ResponseCache(redis_url or os.getenv("REDIS_URL"))
@@ -0,0 +1,173 @@
+"""
+Session Store Module
+Keeps chat sessions in process memory, or in Redis when REDIS_URL is set so
+that every worker sees the same sessions
+"""
+
+import os
+import orjson
+import logging
+from collections import deque
+from typing import Dict, Optional
+from cachetools import TTLCache
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # Redis is optional; the in-memory store needs nothing extra
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+MAX_CHAT_HISTORY = 200  # oldest turns drop off once a session reaches this size
+MAX_SESSIONS = 10_000  # in-memory sessions kept before the least recently used are evicted
+SESSION_TTL = 24 * 60 * 60  # seconds an idle session is kept
+
+
+class SessionStore:
+    """
+    In-process session store (single worker only), evicting idle sessions after SESSION_TTL
+
+    Methods are coroutines so callers await the same API whichever store is in use.
+    """
+
+    def __init__(self, max_history: int = MAX_CHAT_HISTORY, max_sessions: int = MAX_SESSIONS, ttl: int = SESSION_TTL):
+        self.max_history = max_history
+        self._sessions: Dict[str, Dict] = TTLCache(maxsize=max_sessions, ttl=ttl)
+
+    async def exists(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        """Return the session dict, or None if it does not exist"""
+        return self._sessions.get(session_id)
+
+    async def create(self, session_id: str, data: Dict) -> Dict:
+        """Store a new session; chat_history becomes a bounded deque"""
+        data["chat_history"] = deque(data.get("chat_history", ()), maxlen=self.max_history)
+        self._sessions[session_id] = data
+        return data
+
+    async def update(self, session_id: str, **fields) -> None:
+        """Set top-level session fields (never chat_history)"""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.update(fields)
+
+    async def append_message(self, session_id: str, message: Dict, left: bool = False) -> None:
+        """Append a chat message; left=True puts it before existing history"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        history = session["chat_history"]
+        if left:
+            # A full deque would drop its newest turn; the prepended one is the oldest
+            if len(history) < history.maxlen:
+                history.appendleft(message)
+        else:
+            history.append(message)
+        # Re-inserting restarts the session's TTL, so active chats are kept
+        self._sessions[session_id] = session
+
+    async def close(self) -> None:
+        """Release the store's connections (nothing to do in memory)"""
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store shared across workers
+
+    Session fields live in a hash (one JSON value per field) and chat history
+    in a companion list, so appends from concurrent requests never clobber
+    each other or the profile data written by background scraping. Uses the
+    asyncio client, so a round-trip never blocks the event loop.
+    """
+
+    def __init__(self, url: str, max_history: int = MAX_CHAT_HISTORY, ttl: int = SESSION_TTL):
+        self.max_history = max_history
+        self.ttl = ttl
+        pool = redis.asyncio.ConnectionPool.from_url(url, max_connections=64, decode_responses=True)
+        self.client = redis.asyncio.Redis(connection_pool=pool)
+
+    @staticmethod
+    def _keys(session_id: str):
+        return f"sess:{session_id}", f"sess:{session_id}:history"
+
+    async def exists(self, session_id: str) -> bool:
+        return bool(await self.client.exists(self._keys(session_id)[0]))
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        meta_key, history_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.hgetall(meta_key)
+        pipe.lrange(history_key, 0, -1)
+        fields, history = await pipe.execute()
+        if not fields:
+            return None
+        session = {name: orjson.loads(value) for name, value in fields.items()}
+        session["chat_history"] = deque((orjson.loads(item) for item in history), maxlen=self.max_history)
+        return session
+
+    async def create(self, session_id: str, data: Dict) -> Dict:
+        meta_key, history_key = self._keys(session_id)
+        history = list(data.get("chat_history", ()))[-self.max_history:]
+        fields = {name: orjson.dumps(value) for name, value in data.items() if name != "chat_history"}
+        pipe = self.client.pipeline()
+        pipe.delete(meta_key, history_key)
+        pipe.hset(meta_key, mapping=fields)
+        if history:
+            pipe.rpush(history_key, *(orjson.dumps(item) for item in history))
+        pipe.expire(meta_key, self.ttl)
+        pipe.expire(history_key, self.ttl)
+        await pipe.execute()
+        data["chat_history"] = deque(history, maxlen=self.max_history)
+        return data
+
+    async def update(self, session_id: str, **fields) -> None:
+        meta_key, history_key = self._keys(session_id)
+        # Writing to a missing or expired session would leave a partial hash behind
+        if not await self.client.exists(meta_key):
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(meta_key, mapping={name: orjson.dumps(value) for name, value in fields.items()})
+        # Refreshed alongside the write, so the hash can never outlive its TTL
+        pipe.expire(meta_key, self.ttl)
+        pipe.expire(history_key, self.ttl)
+        await pipe.execute()
+
+    async def append_message(self, session_id: str, message: Dict, left: bool = False) -> None:
+        meta_key, history_key = self._keys(session_id)
+        pipe = self.client.pipeline()
+        if left:
+            pipe.lpush(history_key, orjson.dumps(message))
+        else:
+            pipe.rpush(history_key, orjson.dumps(message))
+        # The list runs oldest to newest, so the oldest turns are always the ones trimmed
+        pipe.ltrim(history_key, -self.max_history, -1)
+        pipe.expire(meta_key, self.ttl)
+        pipe.expire(history_key, self.ttl)
+        await pipe.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_session_store(redis_url: str = None) -> SessionStore:
+    """
+    Create the session store
+
+    Args:
+        redis_url: Redis connection URL (defaults to REDIS_URL env var)
+
+    Returns:
+        RedisSessionStore when a URL is configured and redis is installed,
+        otherwise the in-memory SessionStore
+    """
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    if redis_url:
+        if redis is None:
+            logger.warning("⚠️ REDIS_URL is set but the redis package is not installed - using in-memory sessions")
+        else:
+            logger.info("✅ Using Redis session store")
+            return RedisSessionStore(redis_url)
+    return SessionStore()
@@ -4,80 +4,282 @@ Replaces tavily-python package to avoid Rust compiler issues on Vercel
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import orjson
+import asyncio
 import os
+import re
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 # Configure logging
 logger = logging.getLogger(__name__)
 
+SEARCH_CACHE_SIZE = 512  # distinct searches (query plus request options) kept
+SEARCH_CACHE_TTL = 300  # seconds a search result is reused
+SEARCH_TIMEOUT = 20  # seconds to wait for one pooled search, retries included
+
+# Circuit breaker: skip Tavily entirely while it is known to be failing
+AUTH_FAILURE_COOLDOWN = 300  # seconds to stop calling after a 401 (bad key)
+FAILURE_THRESHOLD = 3  # consecutive rate limits/timeouts before backing off
+FAILURE_COOLDOWN = 30  # seconds to stop calling after FAILURE_THRESHOLD failures
+
+# Shared pool for running a lookup's searches side by side in the sync API
+search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tavily")
+
+# Patterns and keyword tables used by the content extractors, built once
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'[\+]?[1-9]?[0-9]{3}[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}')
+LOCATION_RES = tuple(re.compile(pattern) for pattern in (
+    r'located in ([^,.]+)',
+    r'based in ([^,.]+)',
+    r'from ([^,.]+)',
+    r'in ([A-Z][a-z]+, [A-Z]{2})',  # City, State
+    r'([A-Z][a-z]+, [A-Z][a-z]+)',  # City, Country
+))
+
+INDUSTRY_KEYWORDS = {
+    'Technology': ('software', 'tech', 'digital', 'IT', 'development', 'programming', 'app', 'platform'),
+    'Healthcare': ('health', 'medical', 'hospital', 'clinic', 'pharmacy', 'healthcare'),
+    'Finance': ('bank', 'finance', 'investment', 'accounting', 'insurance', 'financial'),
+    'Education': ('education', 'school', 'university', 'training', 'learning', 'academic'),
+    'Retail': ('retail', 'shop', 'store', 'ecommerce', 'sales', 'marketplace'),
+    'Manufacturing': ('manufacturing', 'production', 'factory', 'industrial', 'assembly'),
+    'Consulting': ('consulting', 'advisory', 'professional services', 'strategy')
+}
+SERVICE_PATTERNS = (
+    'services include', 'we offer', 'we provide', 'specializes in',
+    'solutions include', 'products include', 'services are'
+)
+SKILL_KEYWORDS = (
+    'python', 'javascript', 'java', 'react', 'node.js', 'aws', 'docker', 'kubernetes',
+    'machine learning', 'data science', 'artificial intelligence', 'blockchain',
+    'project management', 'leadership', 'strategy', 'marketing', 'sales', 'finance',
+    'design', 'ux', 'ui', 'product management', 'agile', 'scrum', 'devops',
+    'sql', 'excel', 'powerbi', 'tableau', 'analytics', 'consulting'
+)
+EXPERIENCE_PATTERNS = (
+    'years of experience', 'experience in', 'worked at', 'previously at', 'former', 'current role'
+)
+EDUCATION_KEYWORDS = (
+    'university', 'college', 'degree', 'bachelor', 'master', 'phd',
+    'graduate', 'studied', 'education', 'school', 'mba'
+)
+ACHIEVEMENT_PATTERNS = (
+    'award', 'recognition', 'achievement', 'won', 'received',
+    'founded', 'launched', 'led', 'managed', 'created',
+    'published', 'speaker', 'featured'
+)
+
+def _keyword_re(keywords: tuple) -> re.Pattern:
+    """One alternation regex matching any of the keywords as a substring"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+# Per-sentence keyword tests; on sentence-sized strings one regex search is
+# faster than a Python-level any() over the patterns
+SERVICE_RE = _keyword_re(SERVICE_PATTERNS)
+EXPERIENCE_RE = _keyword_re(EXPERIENCE_PATTERNS)
+EDUCATION_RE = _keyword_re(EDUCATION_KEYWORDS)
+ACHIEVEMENT_RE = _keyword_re(ACHIEVEMENT_PATTERNS)
+
+SOCIAL_DOMAINS = {
+    'linkedin.com': 'linkedin',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'github.com': 'github',
+    'crunchbase.com': 'crunchbase',
+    'medium.com': 'medium',
+    'youtube.com': 'youtube'
+}
+
+# Read-only prototypes for fallback search results; each fallback gets a copy
+PROFILE_FALLBACK_RESULT = MappingProxyType({
+    "title": "Professional Profile Information",
+    "url": "https://linkedin.com",
+    "content": "Professional with experience in their field. Known for expertise and dedication to their work. Active in professional networks and industry communities.",
+    "score": 0.5
+})
+GENERIC_FALLBACK_RESULT = MappingProxyType({
+    "title": "Information",
+    "url": "https://example.com",
+    "content": "Professional individual or organization with experience in their field. Known for their work and contributions.",
+    "score": 0.5
+})
+PROFILE_QUERY_WORDS = ("linkedin", "profile", "professional")
+
 class TavilyDirect:
     """Direct Tavily API client for web scraping without dependencies"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or os.getenv('TAVILY_API_KEY')
+    def __init__(self, api_key: str = None, session: Optional[requests.Session] = None):
+        if not api_key:
+            # Only standalone use needs .env here; the app loads it at startup
+            load_dotenv(override=False)
+            api_key = os.getenv('TAVILY_API_KEY')
+        self.api_key = api_key
         self.base_url = "https://api.tavily.com"
+        # One pooled keep-alive session so repeated searches skip TCP/TLS setup
+        self.session = session or create_http_session()
+        # Async client for search_async, created on first use inside the event loop
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # Recent search results; search() runs in worker threads, hence the lock
+        self._search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        self._search_cache_lock = threading.Lock()
+        # Circuit breaker state (see AUTH_FAILURE_COOLDOWN / FAILURE_COOLDOWN)
+        self._breaker_open_until = 0.0
+        self._consecutive_failures = 0
         
         if not self.api_key:
             logger.warning("Tavily API key not found - web scraping will use fallback")
     
-    def search(self, query: str, max_results: int = 5, search_depth: str = "basic") -> Dict:
+    def search(self, query: str, max_results: int = 5, search_depth: str = "basic",
+               include_raw_content: bool = False, include_answer: bool = True) -> Dict:
         """
         Search using Tavily API directly (no tiktoken dependency)
+        
+        include_raw_content asks Tavily for each page's full text, which makes
+        the response many times larger; callers that only read the content
+        snippets leave it off.
         """
         try:
             if not self.api_key:
                 logger.warning("No Tavily API key - using fallback")
                 return self._create_fallback_results(query)
             
-            url = f"{self.base_url}/search"
-            
-            payload = {
-                "api_key": self.api_key,
-                "query": query,
-                "max_results": max_results,
-                "search_depth": search_depth,
-                "include_answer": True,
-                "include_raw_content": True
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (compatible; TavilyBot/1.0)"
-            }
+            key = (query, max_results, search_depth, include_raw_content, include_answer)
+            cached = self._get_cached_search(key)
+            if cached is not None:
+                return cached
+            if self._breaker_open():
+                return self._create_fallback_results(query)
             
             logger.info(f"🔍 Searching Tavily for: {query}")
             
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            response = self.session.post(
+                f"{self.base_url}/search",
+                json=self._search_payload(key),
+                timeout=15
+            )
+            return self._cache_search(key, self._handle_search_response(response, query))
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"✅ Tavily search successful: {len(result.get('results', []))} results")
-                return result
-            elif response.status_code == 401:
-                logger.error("❌ Tavily API key invalid")
-                return self._create_fallback_results(query)
-            elif response.status_code == 429:
-                logger.error("❌ Tavily rate limit exceeded")
+        except requests.exceptions.Timeout:
+            logger.error("❌ Tavily API timeout")
+            self._record_failure()
+            return self._create_fallback_results(query)
+        except requests.exceptions.ConnectionError:
+            logger.error("❌ Tavily API connection error")
+            self._record_failure()
+            return self._create_fallback_results(query)
+        except Exception as e:
+            logger.error(f"❌ Tavily search error: {str(e)}")
+            return self._create_fallback_results(query)
+    
+    async def search_async(self, query: str, max_results: int = 5, search_depth: str = "basic",
+                           include_raw_content: bool = False, include_answer: bool = True) -> Dict:
+        """
+        Non-blocking variant of search() on a pooled httpx.AsyncClient
+        """
+        try:
+            if not self.api_key:
+                logger.warning("No Tavily API key - using fallback")
                 return self._create_fallback_results(query)
-            else:
-                logger.error(f"❌ Tavily API error: {response.status_code}")
+            
+            key = (query, max_results, search_depth, include_raw_content, include_answer)
+            cached = self._get_cached_search(key)
+            if cached is not None:
+                return cached
+            if self._breaker_open():
                 return self._create_fallback_results(query)
             
-        except requests.exceptions.Timeout:
+            logger.info(f"🔍 Searching Tavily for: {query}")
+            
+            if self._async_client is None:
+                self._async_client = create_async_http_client()
+            response = await self._async_client.post(
+                f"{self.base_url}/search",
+                json=self._search_payload(key)
+            )
+            return self._cache_search(key, self._handle_search_response(response, query))
+            
+        except httpx.TimeoutException:
             logger.error("❌ Tavily API timeout")
+            self._record_failure()
             return self._create_fallback_results(query)
-        except requests.exceptions.ConnectionError:
+        except httpx.TransportError:
             logger.error("❌ Tavily API connection error")
+            self._record_failure()
             return self._create_fallback_results(query)
         except Exception as e:
             logger.error(f"❌ Tavily search error: {str(e)}")
             return self._create_fallback_results(query)
     
+    def _breaker_open(self) -> bool:
+        """True while recent failures say Tavily calls should be skipped"""
+        return time.monotonic() < self._breaker_open_until
+    
+    def _open_breaker(self, seconds: int) -> None:
+        self._breaker_open_until = time.monotonic() + seconds
+        logger.warning(f"⚠️ Skipping Tavily calls for {seconds}s")
+    
+    def _record_failure(self) -> None:
+        """Count a rate limit/timeout; back off after FAILURE_THRESHOLD in a row"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= FAILURE_THRESHOLD:
+            self._consecutive_failures = 0
+            self._open_breaker(FAILURE_COOLDOWN)
+    
+    def _get_cached_search(self, key: tuple) -> Optional[Dict]:
+        """Return a recent result for the same search, if any"""
+        with self._search_cache_lock:
+            result = self._search_cache.get(key)
+        if result is not None:
+            logger.info(f"♻️ Tavily cache hit for: {key[0]}")
+        return result
+    
+    def _cache_search(self, key: tuple, result: Dict) -> Dict:
+        """Remember a successful search result; fallback data is never cached"""
+        if not result.get('fallback'):
+            with self._search_cache_lock:
+                self._search_cache[key] = result
+        return result
+    
+    def _search_payload(self, key: tuple) -> Dict:
+        """Request body for the Tavily /search endpoint from a search cache key"""
+        query, max_results, search_depth, include_raw_content, include_answer = key
+        return {
+            "api_key": self.api_key,
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content
+        }
+    
+    def _handle_search_response(self, response, query: str) -> Dict:
+        """Turn a requests/httpx response into search results or fallback data"""
+        if response.status_code == 200:
+            self._consecutive_failures = 0
+            result = orjson.loads(response.content)
+            logger.info(f"✅ Tavily search successful: {len(result.get('results', []))} results")
+            return result
+        elif response.status_code == 401:
+            logger.error("❌ Tavily API key invalid")
+            self._open_breaker(AUTH_FAILURE_COOLDOWN)
+        elif response.status_code == 429:
+            logger.error("❌ Tavily rate limit exceeded")
+            self._record_failure()
+        else:
+            logger.error(f"❌ Tavily API error: {response.status_code}")
+        return self._create_fallback_results(query)
+    
     def get_search_context(self, query: str, max_results: int = 3) -> str:
         """
         Get search context formatted for AI processing
@@ -88,26 +290,27 @@ class TavilyDirect:
             if not results.get('results'):
                 return f"No search results found for: {query}"
             
-            context = f"Search results for '{query}':\n\n"
+            parts = [f"Search results for '{query}':\n\n"]
             
             # Add answer if available
             if results.get('answer'):
-                context += f"Summary: {results['answer']}\n\n"
+                parts.append(f"Summary: {results['answer']}\n\n")
             
             # Add individual results
             for i, result in enumerate(results['results'], 1):
-                context += f"Source {i}:\n"
-                context += f"Title: {result.get('title', 'N/A')}\n"
-                context += f"URL: {result.get('url', 'N/A')}\n"
+                parts.append(f"Source {i}:\n")
+                parts.append(f"Title: {result.get('title', 'N/A')}\n")
+                parts.append(f"URL: {result.get('url', 'N/A')}\n")
                 
                 # Use content or raw_content
                 content = result.get('content') or result.get('raw_content', '')
                 if content:
-                    context += f"Content: {content[:1000]}...\n\n"
+                    snippet = content if len(content) <= 1000 else f"{content[:1000]}..."
+                    parts.append(f"Content: {snippet}\n\n")
                 else:
-                    context += f"Content: Not available\n\n"
+                    parts.append(f"Content: Not available\n\n")
             
-            return context
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"❌ Error getting search context: {str(e)}")
@@ -126,26 +329,23 @@ class TavilyDirect:
             
             logger.info(f"🏢 Scraping company info for: {company_name}")
             
-            results = self.search(query, max_results=3, search_depth="advanced")
+            results = self.search(query, max_results=3, search_depth="advanced", include_raw_content=True)
             
             if not results.get('results'):
                 return self._create_fallback_company_info(company_name)
             
             # Extract info from search results
             first_result = results['results'][0]
-            all_content = ""
-            
-            # Combine content from all results
-            for result in results['results']:
-                content = result.get('content', '') or result.get('raw_content', '')
-                all_content += content + " "
+            all_content = self._join_content(results['results'])
+            content_lower = all_content.lower()
+            sentences = self._split_sentences(all_content, content_lower)
             
             return {
                 'company_name': company_name,
                 'website': first_result.get('url', website or ''),
-                'description': self._extract_description(all_content, company_name, results.get('answer')),
-                'industry': self._extract_industry_from_content(all_content),
-                'services': self._extract_services_from_content(all_content),
+                'description': self._extract_description(all_content, company_name, results.get('answer'), sentences),
+                'industry': self._extract_industry_from_content(all_content, content_lower),
+                'services': self._extract_services_from_content(all_content, sentences),
                 'contact_info': self._extract_contact_from_content(all_content),
                 'social_media': {},
                 'scraped_successfully': True,
@@ -157,82 +357,74 @@ class TavilyDirect:
             logger.error(f"❌ Company info scraping failed: {str(e)}")
             return self._create_fallback_company_info(company_name)
     
-    def _extract_description(self, content: str, company_name: str, answer: str = None) -> str:
+    def _join_content(self, results: List[Dict]) -> str:
+        """Concatenate the text of every search result in one pass"""
+        return " ".join(result.get('content', '') or result.get('raw_content', '') for result in results)
+    
+    def _split_sentences(self, content: str, content_lower: str = None) -> List[tuple]:
+        """Split content into (stripped sentence, lowercased sentence) pairs once for all extractors"""
+        # Lowercase the whole buffer once and split both copies on the same
+        # periods, instead of lowercasing every sentence separately
+        return [
+            (sentence.strip(), sentence_lower)
+            for sentence, sentence_lower in zip(content.split('.'), (content_lower or content.lower()).split('.'))
+        ]
+    
+    def _extract_description(self, content: str, company_name: str, answer: str = None, sentences: List[tuple] = None) -> str:
         """Extract company description from content"""
         if answer and len(answer) > 50:
             return answer[:500]
         
         if content and len(content) > 100:
             # Find sentences containing company name
-            sentences = content.split('.')
+            company_lower = company_name.lower()
             relevant_sentences = []
             
-            for sentence in sentences:
-                if company_name.lower() in sentence.lower() and len(sentence.strip()) > 50:
-                    relevant_sentences.append(sentence.strip())
+            for sentence, sentence_lower in sentences or self._split_sentences(content):
+                if company_lower in sentence_lower and len(sentence) > 50:
+                    relevant_sentences.append(sentence)
                     if len(relevant_sentences) >= 2:
                         break
             
             if relevant_sentences:
                 description = '. '.join(relevant_sentences)
-                return description[:500] + "..." if len(description) > 500 else description
+                return description if len(description) <= 500 else f"{description[:500]}..."
         
         return f"{company_name} is a professional company. More information can be found on their official website."
     
-    def _extract_industry_from_content(self, content: str) -> str:
+    def _extract_industry_from_content(self, content: str, content_lower: str = None) -> str:
         """Extract industry from content"""
         if not content:
             return "Professional Services"
         
-        content_lower = content.lower()
-        industry_keywords = {
-            'Technology': ['software', 'tech', 'digital', 'IT', 'development', 'programming', 'app', 'platform'],
-            'Healthcare': ['health', 'medical', 'hospital', 'clinic', 'pharmacy', 'healthcare'],
-            'Finance': ['bank', 'finance', 'investment', 'accounting', 'insurance', 'financial'],
-            'Education': ['education', 'school', 'university', 'training', 'learning', 'academic'],
-            'Retail': ['retail', 'shop', 'store', 'ecommerce', 'sales', 'marketplace'],
-            'Manufacturing': ['manufacturing', 'production', 'factory', 'industrial', 'assembly'],
-            'Consulting': ['consulting', 'advisory', 'professional services', 'strategy']
-        }
+        content_lower = content_lower or content.lower()
         
-        for industry, keywords in industry_keywords.items():
+        for industry, keywords in INDUSTRY_KEYWORDS.items():
             if any(keyword in content_lower for keyword in keywords):
                 return industry
         
         return "Professional Services"
     
-    def _extract_services_from_content(self, content: str) -> List[str]:
+    def _extract_services_from_content(self, content: str, sentences: List[tuple] = None) -> List[str]:
         """Extract services from content"""
         if not content:
             return ["Professional Services"]
         
-        content_lower = content.lower()
         services = []
-        
-        # Common service keywords
-        service_patterns = [
-            'services include', 'we offer', 'we provide', 'specializes in', 
-            'solutions include', 'products include', 'services are'
-        ]
-        
-        sentences = content.split('.')
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(pattern in sentence_lower for pattern in service_patterns):
+        for sentence, sentence_lower in sentences or self._split_sentences(content):
+            if SERVICE_RE.search(sentence_lower):
                 # Extract the part after the service indicator
-                for pattern in service_patterns:
+                for pattern in SERVICE_PATTERNS:
                     if pattern in sentence_lower:
                         service_part = sentence_lower.split(pattern)[1] if pattern in sentence_lower else ""
                         if service_part:
-                            services.append(sentence.strip()[:100])
+                            services.append(sentence[:100])
                         break
         
         return services[:3] if services else ["Professional Services"]
     
     def _extract_contact_from_content(self, content: str) -> Dict:
         """Extract contact information from content"""
-        import re
-        
         contact = {}
         
         if not content:
@@ -240,16 +432,14 @@ class TavilyDirect:
         
         try:
             # Extract email
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, content)
-            if emails:
-                contact['email'] = emails[0]
+            email = EMAIL_RE.search(content)
+            if email:
+                contact['email'] = email.group()
             
             # Extract phone
-            phone_pattern = r'[\+]?[1-9]?[0-9]{3}[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
-            phones = re.findall(phone_pattern, content)
-            if phones:
-                contact['phone'] = phones[0]
+            phone = PHONE_RE.search(content)
+            if phone:
+                contact['phone'] = phone.group()
         except Exception as e:
             logger.warning(f"Contact extraction error: {e}")
         
@@ -260,30 +450,17 @@ class TavilyDirect:
         logger.info(f"🔄 Using fallback data for query: {query}")
         
         # Create realistic fallback data based on query
-        if any(word in query.lower() for word in ["linkedin", "profile", "professional"]):
-            return {
-                "results": [{
-                    "title": f"Professional Profile Information",
-                    "url": "https://linkedin.com",
-                    "content": f"Professional with experience in their field. Known for expertise and dedication to their work. Active in professional networks and industry communities.",
-                    "score": 0.5
-                }],
-                "answer": f"Professional individual with expertise in their field.",
-                "query": query,
-                "fallback": True
-            }
+        query_lower = query.lower()
+        if any(word in query_lower for word in PROFILE_QUERY_WORDS):
+            result, answer = PROFILE_FALLBACK_RESULT, "Professional individual with expertise in their field."
         else:
-            return {
-                "results": [{
-                    "title": f"Information",
-                    "url": "https://example.com", 
-                    "content": f"Professional individual or organization with experience in their field. Known for their work and contributions.",
-                    "score": 0.5
-                }],
-                "answer": f"Professional entity with industry experience.",
-                "query": query,
-                "fallback": True
-            }
+            result, answer = GENERIC_FALLBACK_RESULT, "Professional entity with industry experience."
+        return {
+            "results": [dict(result)],
+            "answer": answer,
+            "query": query,
+            "fallback": True
+        }
     
     def _create_fallback_company_info(self, company_name: str) -> Dict:
         """Create fallback company info when search fails"""
@@ -319,21 +496,17 @@ class TavilyDirect:
                 return self._create_fallback_user_info(name, company)
             
             # Extract content from results
-            all_content = ""
-            first_result = results['results'][0]
-            
-            for result in results['results']:
-                content = result.get('content', '') or result.get('raw_content', '')
-                all_content += content + " "
+            all_content = self._join_content(results['results'])
+            content_lower = all_content.lower()
             
             # Structure for chat template
             web_info = {
                 'summary': self._extract_user_summary(all_content, name, results.get('answer')),
                 'professional_info': {
-                    'title': self._extract_title_from_content(all_content, name),
+                    'title': self._extract_title_from_content(all_content, name, content_lower),
                     'location': self._extract_location_from_content(all_content),
-                    'industry': self._extract_industry_from_content(all_content),
-                    'skills': self._extract_skills_from_content(all_content)
+                    'industry': self._extract_industry_from_content(all_content, content_lower),
+                    'skills': self._extract_skills_from_content(all_content, content_lower)
                 },
                 'social_links': self._extract_social_links_from_content(all_content, results['results']),
                 'recent_activity': self._extract_recent_activity(results['results']),
@@ -354,69 +527,110 @@ class TavilyDirect:
         Get comprehensive user information (enhanced version of quick_user_summary)
         """
         try:
-            # Multiple searches for comprehensive info
-            queries = []
-            if company:
-                queries = [
-                    f"{name} {company} LinkedIn profile",
-                    f"{name} {company} professional background",
-                    f"{name} {company} recent news articles"
-                ]
-            else:
-                queries = [
-                    f"{name} LinkedIn professional profile",
-                    f"{name} professional background career",
-                    f"{name} recent activity news"
-                ]
-            
+            queries = self._comprehensive_queries(name, company)
             logger.info(f"🔍 Comprehensive search for: {name}")
             
-            all_results = []
-            all_content = ""
-            
-            # Perform multiple searches
-            for query in queries:
+            # Run the searches concurrently; the pooled session is thread-safe
+            futures = [
+                search_pool.submit(self.search, query, max_results=2, search_depth="advanced")
+                for query in queries
+            ]
+            responses = []
+            for future in futures:
                 try:
-                    search_results = self.search(query, max_results=2, search_depth="advanced")
-                    if search_results.get('results'):
-                        all_results.extend(search_results['results'])
-                        
-                        for result in search_results['results']:
-                            content = result.get('content', '') or result.get('raw_content', '')
-                            all_content += content + " "
+                    responses.append(future.result(timeout=SEARCH_TIMEOUT))
                 except Exception as e:
-                    logger.warning(f"Search query failed: {query} - {e}")
+                    responses.append(e)
             
-            if not all_results:
-                return self._create_fallback_user_info(name, company)
+            return self._build_comprehensive_info(name, company, queries, responses)
             
-            # Enhanced structure for comprehensive info
-            web_info = {
-                'summary': self._extract_user_summary(all_content, name),
-                'professional_info': {
-                    'title': self._extract_title_from_content(all_content, name),
-                    'location': self._extract_location_from_content(all_content),
-                    'industry': self._extract_industry_from_content(all_content),
-                    'skills': self._extract_skills_from_content(all_content),
-                    'experience': self._extract_experience_from_content(all_content, name),
-                    'education': self._extract_education_from_content(all_content)
-                },
-                'social_links': self._extract_social_links_from_content(all_content, all_results),
-                'recent_activity': self._extract_recent_activity(all_results),
-                'contact_info': self._extract_contact_from_content(all_content),
-                'achievements': self._extract_achievements_from_content(all_content, name),
-                'scraped_successfully': len(all_results) > 0,
-                'source': 'tavily_comprehensive',
-                'total_results': len(all_results),
-                'fallback_used': len(all_results) == 0
-            }
+        except Exception as e:
+            logger.error(f"❌ Comprehensive info failed: {str(e)}")
+            return self._create_fallback_user_info(name, company)
+    
+    async def get_comprehensive_info_async(self, name: str, company: str = None) -> Dict:
+        """
+        get_comprehensive_info with the searches run concurrently, so the
+        lookup takes one Tavily round-trip instead of three
+        """
+        try:
+            queries = self._comprehensive_queries(name, company)
+            logger.info(f"🔍 Comprehensive search for: {name}")
             
-            return web_info
+            responses = await asyncio.gather(
+                *(self.search_async(query, max_results=2, search_depth="advanced") for query in queries),
+                return_exceptions=True
+            )
+            
+            return self._build_comprehensive_info(name, company, queries, responses)
             
         except Exception as e:
             logger.error(f"❌ Comprehensive info failed: {str(e)}")
             return self._create_fallback_user_info(name, company)
     
+    def _comprehensive_queries(self, name: str, company: str = None) -> List[str]:
+        """Search queries used for a comprehensive lookup"""
+        if company:
+            return [
+                f"{name} {company} LinkedIn profile",
+                f"{name} {company} professional background",
+                f"{name} {company} recent news articles"
+            ]
+        return [
+            f"{name} LinkedIn professional profile",
+            f"{name} professional background career",
+            f"{name} recent activity news"
+        ]
+    
+    def _build_comprehensive_info(self, name: str, company: Optional[str], queries: List[str], responses: List) -> Dict:
+        """Merge the comprehensive search responses (or exceptions) into web info"""
+        all_results = []
+        seen_urls = set()
+        
+        for query, search_results in zip(queries, responses):
+            if isinstance(search_results, Exception):
+                logger.warning(f"Search query failed: {query} - {search_results}")
+                continue
+            # The queries overlap, so the same page often comes back more than once
+            for result in search_results.get('results') or ():
+                url = result.get('url')
+                if url:
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                all_results.append(result)
+        
+        if not all_results:
+            return self._create_fallback_user_info(name, company)
+        
+        all_content = self._join_content(all_results)
+        content_lower = all_content.lower()
+        sentences = self._split_sentences(all_content, content_lower)
+        buckets = self._classify_sentences(sentences, name)
+        
+        # Enhanced structure for comprehensive info
+        web_info = {
+            'summary': self._extract_user_summary(all_content, name, sentences=sentences),
+            'professional_info': {
+                'title': self._extract_title_from_content(all_content, name, content_lower),
+                'location': self._extract_location_from_content(all_content),
+                'industry': self._extract_industry_from_content(all_content, content_lower),
+                'skills': self._extract_skills_from_content(all_content, content_lower),
+                'experience': self._extract_experience_from_content(all_content, name, buckets),
+                'education': self._extract_education_from_content(all_content, buckets)
+            },
+            'social_links': self._extract_social_links_from_content(all_content, all_results),
+            'recent_activity': self._extract_recent_activity(all_results),
+            'contact_info': self._extract_contact_from_content(all_content),
+            'achievements': self._extract_achievements_from_content(all_content, name, buckets),
+            'scraped_successfully': len(all_results) > 0,
+            'source': 'tavily_comprehensive',
+            'total_results': len(all_results),
+            'fallback_used': len(all_results) == 0
+        }
+        
+        return web_info
+    
     def _create_fallback_user_info(self, name: str, company: str = None) -> Dict:
         """Create fallback user info when searches fail"""
         return {
@@ -435,34 +649,34 @@ class TavilyDirect:
             'fallback_used': True
         }
     
-    def _extract_user_summary(self, content: str, name: str, answer: str = None) -> str:
+    def _extract_user_summary(self, content: str, name: str, answer: str = None, sentences: List[tuple] = None) -> str:
         """Extract user summary from content"""
-        if answer and len(answer) > 50 and name.lower() in answer.lower():
-            return answer[:400] + "..." if len(answer) > 400 else answer
+        name_lower = name.lower()
+        if answer and len(answer) > 50 and name_lower in answer.lower():
+            return answer if len(answer) <= 400 else f"{answer[:400]}..."
         
         if content and len(content) > 100:
             # Find sentences about the person
-            sentences = content.split('.')
             relevant_sentences = []
             
-            for sentence in sentences:
-                if name.lower() in sentence.lower() and len(sentence.strip()) > 30:
-                    relevant_sentences.append(sentence.strip())
+            for sentence, sentence_lower in sentences or self._split_sentences(content):
+                if name_lower in sentence_lower and len(sentence) > 30:
+                    relevant_sentences.append(sentence)
                     if len(relevant_sentences) >= 3:
                         break
             
             if relevant_sentences:
                 summary = '. '.join(relevant_sentences)
-                return summary[:400] + "..." if len(summary) > 400 else summary
+                return summary if len(summary) <= 400 else f"{summary[:400]}..."
         
         return f"{name} is a professional with experience in their field. Additional information can be found through their professional networks."
     
-    def _extract_title_from_content(self, content: str, name: str) -> str:
+    def _extract_title_from_content(self, content: str, name: str, content_lower: str = None) -> str:
         """Extract job title from content"""
         if not content:
             return "Professional"
         
-        content_lower = content.lower()
+        content_lower = content_lower or content.lower()
         name_lower = name.lower()
         
         # Look for common title patterns
@@ -499,44 +713,25 @@ class TavilyDirect:
         if not content:
             return "Not specified"
         
-        import re
-        
         # Look for location patterns
-        location_patterns = [
-            r'located in ([^,.]+)',
-            r'based in ([^,.]+)',
-            r'from ([^,.]+)',
-            r'in ([A-Z][a-z]+, [A-Z]{2})',  # City, State
-            r'([A-Z][a-z]+, [A-Z][a-z]+)',  # City, Country
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, content)
-            if matches:
-                location = matches[0].strip()
+        for pattern in LOCATION_RES:
+            match = pattern.search(content)
+            if match:
+                location = match.group(1).strip()
                 if len(location) < 50 and len(location) > 2:
                     return location
         
         return "Not specified"
     
-    def _extract_skills_from_content(self, content: str) -> List[str]:
+    def _extract_skills_from_content(self, content: str, content_lower: str = None) -> List[str]:
         """Extract skills from content"""
         if not content:
             return []
         
-        content_lower = content.lower()
+        content_lower = content_lower or content.lower()
         skills = []
         
-        # Common skill keywords
-        skill_keywords = [
-            'python', 'javascript', 'java', 'react', 'node.js', 'aws', 'docker', 'kubernetes',
-            'machine learning', 'data science', 'artificial intelligence', 'blockchain',
-            'project management', 'leadership', 'strategy', 'marketing', 'sales', 'finance',
-            'design', 'ux', 'ui', 'product management', 'agile', 'scrum', 'devops',
-            'sql', 'excel', 'powerbi', 'tableau', 'analytics', 'consulting'
-        ]
-        
-        for skill in skill_keywords:
+        for skill in SKILL_KEYWORDS:
             if skill in content_lower:
                 skills.append(skill.title())
         
@@ -546,21 +741,17 @@ class TavilyDirect:
         """Extract social media links from content and results"""
         social_links = {}
         
-        # Check URLs from results
+        # Classify each result URL by its host, walking up to the parent
+        # domain so subdomains like uk.linkedin.com still match
         for result in results:
             url = result.get('url', '')
-            if 'linkedin.com' in url:
-                social_links['linkedin'] = url
-            elif 'twitter.com' in url or 'x.com' in url:
-                social_links['twitter'] = url
-            elif 'github.com' in url:
-                social_links['github'] = url
-            elif 'crunchbase.com' in url:
-                social_links['crunchbase'] = url
-            elif 'medium.com' in url:
-                social_links['medium'] = url
-            elif 'youtube.com' in url:
-                social_links['youtube'] = url
+            host = (urlparse(url).hostname or '').removeprefix('www.')
+            while host:
+                network = SOCIAL_DOMAINS.get(host)
+                if network:
+                    social_links[network] = url
+                    break
+                host = host.partition('.')[2]
         
         return social_links
     
@@ -576,97 +767,126 @@ class TavilyDirect:
             if title and content:
                 activity = {
                     'title': title[:100],
-                    'snippet': content[:200] + "..." if len(content) > 200 else content,
+                    'snippet': content if len(content) <= 200 else f"{content[:200]}...",
                     'url': url
                 }
                 activities.append(activity)
         
         return activities[:5]  # Limit to 5 activities
     
-    def _extract_experience_from_content(self, content: str, name: str) -> str:
+    def _classify_sentences(self, sentences: List[tuple], name: str) -> Dict[str, List[str]]:
+        """
+        Sort sentences into experience, education and achievement buckets in
+        one pass, stopping once every bucket holds as many as the extractors use
+        """
+        name_lower = name.lower()
+        experience, education, achievements = [], [], []
+        
+        for sentence, sentence_lower in sentences:
+            if len(experience) < 2 and EXPERIENCE_RE.search(sentence_lower):
+                if name_lower in sentence_lower or len(sentence) > 30:
+                    experience.append(sentence)
+            if len(education) < 2 and len(sentence) > 20:
+                if EDUCATION_RE.search(sentence_lower):
+                    education.append(sentence)
+            if len(achievements) < 3 and 20 < len(sentence) < 150:
+                if ACHIEVEMENT_RE.search(sentence_lower):
+                    achievements.append(sentence)
+            if len(experience) == 2 and len(education) == 2 and len(achievements) == 3:
+                break
+        
+        return {'experience': experience, 'education': education, 'achievements': achievements}
+    
+    def _extract_experience_from_content(self, content: str, name: str, buckets: Dict[str, List[str]] = None) -> str:
         """Extract work experience from content"""
         if not content:
             return "Professional experience in their field"
         
-        # Look for experience indicators
-        exp_patterns = [
-            'years of experience',
-            'experience in',
-            'worked at',
-            'previously at',
-            'former',
-            'current role'
-        ]
-        
-        sentences = content.split('.')
-        exp_sentences = []
-        
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(pattern in sentence_lower for pattern in exp_patterns):
-                if name.lower() in sentence_lower or len(sentence.strip()) > 30:
-                    exp_sentences.append(sentence.strip())
-        
-        if exp_sentences:
-            return '. '.join(exp_sentences[:2])
+        buckets = buckets or self._classify_sentences(self._split_sentences(content), name)
+        if buckets['experience']:
+            return '. '.join(buckets['experience'])
         
         return "Professional experience in their field"
     
-    def _extract_education_from_content(self, content: str) -> str:
+    def _extract_education_from_content(self, content: str, buckets: Dict[str, List[str]] = None) -> str:
         """Extract education from content"""
         if not content:
             return "Professional education background"
         
-        content_lower = content.lower()
-        
-        # Look for education keywords
-        edu_keywords = [
-            'university', 'college', 'degree', 'bachelor', 'master', 'phd',
-            'graduate', 'studied', 'education', 'school', 'mba'
-        ]
-        
-        sentences = content.split('.')
-        edu_sentences = []
-        
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(keyword in sentence_lower for keyword in edu_keywords):
-                if len(sentence.strip()) > 20:
-                    edu_sentences.append(sentence.strip())
-        
-        if edu_sentences:
-            return '. '.join(edu_sentences[:2])
+        buckets = buckets or self._classify_sentences(self._split_sentences(content), "")
+        if buckets['education']:
+            return '. '.join(buckets['education'])
         
         return "Professional education background"
     
-    def _extract_achievements_from_content(self, content: str, name: str) -> List[str]:
+    def _extract_achievements_from_content(self, content: str, name: str, buckets: Dict[str, List[str]] = None) -> List[str]:
         """Extract achievements from content"""
         if not content:
             return []
         
-        achievements = []
-        
-        # Look for achievement indicators
-        achievement_patterns = [
-            'award', 'recognition', 'achievement', 'won', 'received',
-            'founded', 'launched', 'led', 'managed', 'created',
-            'published', 'speaker', 'featured'
-        ]
-        
-        sentences = content.split('.')
-        
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(pattern in sentence_lower for pattern in achievement_patterns):
-                if len(sentence.strip()) > 20 and len(sentence.strip()) < 150:
-                    achievements.append(sentence.strip())
-        
-        return achievements[:3]  # Limit to 3 achievements
+        buckets = buckets or self._classify_sentences(self._split_sentences(content), name)
+        return buckets['achievements']  # At most 3 achievements
+
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+
+    async def aclose(self):
+        """Release the async client's pooled connections"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+def create_http_session(pool_maxsize: int = 50) -> requests.Session:
+    """Create a keep-alive requests session with a connection pool for Tavily calls"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=pool_maxsize,
+        # Searches are read-only, so POSTs are safe to retry on transient errors
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Content-Type": "application/json",
+        "User-Agent": "Mozilla/5.0 (compatible; TavilyBot/1.0)"
+    })
+    return session
+
+def create_async_http_client(max_connections: int = 32) -> httpx.AsyncClient:
+    """Create a keep-alive httpx client with a connection pool for async Tavily calls"""
+    return httpx.AsyncClient(
+        timeout=15,
+        # Pool limits belong to the transport; httpx ignores the client's when one is given
+        transport=httpx.AsyncHTTPTransport(
+            retries=2,
+            limits=httpx.Limits(max_connections=max_connections, keepalive_expiry=60)
+        ),
+        headers={
+            "Content-Type": "application/json",
+            "User-Agent": "Mozilla/5.0 (compatible; TavilyBot/1.0)"
+        }
+    )
+
+# Shared instance, created on first use rather than at import
+_tavily_client: Optional[TavilyDirect] = None
 
-# Global instance
-tavily_client = TavilyDirect()
+def get_tavily_client() -> TavilyDirect:
+    """Return the shared Tavily client configured from TAVILY_API_KEY"""
+    global _tavily_client
+    if _tavily_client is None:
+        _tavily_client = TavilyDirect()
+    return _tavily_client
 
 # For compatibility with existing code
-def create_scraper(api_key: str = None):
+def create_scraper(api_key: str = None, session: Optional[requests.Session] = None):
     """Create Tavily client (for compatibility)"""
-    return TavilyDirect(api_key)
\ No newline at end of file
+    return TavilyDirect(api_key, session=session)
\ No newline at end of file
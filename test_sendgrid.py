@@ -6,8 +6,12 @@ Run this to check if your SendGrid setup is working
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+try:
+    from email_service import create_email_service
+    EMAIL_IMPORT_ERROR = None
+except ImportError as e:  # config checks still run without the SendGrid SDK
+    create_email_service = None
+    EMAIL_IMPORT_ERROR = e
 
 def test_sendgrid_config():
     """Test SendGrid configuration"""
@@ -15,12 +19,15 @@ def test_sendgrid_config():
     print("SendGrid Configuration Test")
     print("=" * 60)
     
+    config = {name: os.environ.get(name) for name in ("SENDGRID_API_KEY", "SENDGRID_FROM_EMAIL", "SENDGRID_FROM_NAME")}
+    
     # Check API key
-    api_key = os.getenv("SENDGRID_API_KEY")
+    api_key = config["SENDGRID_API_KEY"]
+    key_ok = bool(api_key) and api_key.startswith("SG.")
     if api_key:
         print("✅ SENDGRID_API_KEY found")
         print(f"   Key starts with: {api_key[:10]}...")
-        if api_key.startswith("SG."):
+        if key_ok:
             print("   ✅ Key format looks correct")
         else:
             print("   ⚠️  Warning: Key should start with 'SG.'")
@@ -29,10 +36,11 @@ def test_sendgrid_config():
         print("   Add: SENDGRID_API_KEY=SG.your_api_key_here")
     
     # Check from email
-    from_email = os.getenv("SENDGRID_FROM_EMAIL")
+    from_email = config["SENDGRID_FROM_EMAIL"]
+    email_ok = bool(from_email) and "@" in from_email
     if from_email:
         print(f"✅ SENDGRID_FROM_EMAIL found: {from_email}")
-        if "@" in from_email:
+        if email_ok:
             print("   ✅ Email format looks valid")
         else:
             print("   ⚠️  Warning: Email format may be invalid")
@@ -41,7 +49,7 @@ def test_sendgrid_config():
         print("   Add: SENDGRID_FROM_EMAIL=noreply@yourdomain.com")
     
     # Check from name
-    from_name = os.getenv("SENDGRID_FROM_NAME")
+    from_name = config["SENDGRID_FROM_NAME"]
     if from_name:
         print(f"✅ SENDGRID_FROM_NAME found: {from_name}")
     else:
@@ -50,37 +58,40 @@ def test_sendgrid_config():
     
     print("\n" + "=" * 60)
     
-    # Test connection if all configs are present
-    if api_key and from_email:
+    # Test connection only if the configuration looks valid; a malformed key
+    # would just fail against the SendGrid API
+    if key_ok and email_ok:
         print("Testing SendGrid API connection...")
         print("=" * 60)
         
-        try:
-            from email_service import create_email_service
-            
-            service = create_email_service()
-            result = service.test_connection()
-            
-            if result["success"]:
-                print("✅ SendGrid connection successful!")
-                print(f"   Status: {result['message']}")
-            else:
-                print("❌ SendGrid connection failed")
-                print(f"   Error: {result['message']}")
-        except Exception as e:
-            print(f"❌ Error testing connection: {e}")
-            print("\nPossible issues:")
-            print("1. Invalid API key")
-            print("2. API key doesn't have 'Mail Send' permission")
-            print("3. Network connectivity issue")
+        if create_email_service is None:
+            print(f"❌ Cannot load email_service: {EMAIL_IMPORT_ERROR}")
+            print("   Install the SendGrid SDK: pip install sendgrid")
+        else:
+            try:
+                service = create_email_service()
+                result = service.test_connection()
+                
+                if result["success"]:
+                    print("✅ SendGrid connection successful!")
+                    print(f"   Status: {result['message']}")
+                else:
+                    print("❌ SendGrid connection failed")
+                    print(f"   Error: {result['message']}")
+            except Exception as e:
+                print(f"❌ Error testing connection: {e}")
+                print("\nPossible issues:")
+                print("1. Invalid API key")
+                print("2. API key doesn't have 'Mail Send' permission")
+                print("3. Network connectivity issue")
     else:
-        print("\n⚠️  Cannot test connection - missing configuration")
-        print("Please add the required environment variables to .env")
+        print("\n⚠️  Cannot test connection - missing or invalid configuration")
+        print("Please fix the environment variables flagged above in .env")
     
     print("\n" + "=" * 60)
     print("Next Steps:")
     print("=" * 60)
-    if not api_key or not from_email:
+    if not key_ok or not email_ok:
         print("1. Add SendGrid credentials to .env file")
         print("2. Verify sender email in SendGrid dashboard")
         print("3. Run this test again: python test_sendgrid.py")
@@ -92,4 +103,6 @@ def test_sendgrid_config():
     print("=" * 60)
 
 if __name__ == "__main__":
+    # Under pytest, conftest.py loads .env once for the whole session
+    load_dotenv()
     test_sendgrid_config()
@@ -5,13 +5,17 @@ This module handles incoming webhooks from SendGrid to track email events
 like opens, clicks, bounces, etc. for the follow-up email system.
 """
 
+import asyncio
 import logging
-import json
+import orjson
 import hmac
 import hashlib
 import base64
+import re
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set
+from cachetools import TTLCache
 from fastapi import Request, HTTPException, Header
 import os
 from dotenv import load_dotenv
@@ -20,6 +24,35 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Structural tokens the streaming parser tracks: escape pairs, quotes and braces
+# (a lone backslash means the escape continues in the next chunk)
+EVENT_TOKEN_RE = re.compile(rb'\\.?|["{}]', re.DOTALL)
+
+# email_tracking column stamped by each tracked SendGrid event type
+TRACKED_EVENT_COLUMNS = {
+    'delivered': 'delivered_at',
+    'open': 'opened_at',
+    'click': 'clicked_at',
+    'bounce': 'bounced_at',
+    'unsubscribe': 'unsubscribed_at',
+    'reply': 'replied_at',
+    # SendGrid sometimes uses 'inbound' for replies
+    'inbound': 'replied_at',
+}
+
+# Tracking row plus the business card the follow-up emails are addressed from
+TRACKING_SELECT = "*, business_cards!business_card_id(id, name, email, company)"
+
+WEBHOOK_BATCH_SIZE = 100  # streamed events processed together, bounding what a request buffers
+
+PROPERTY_EMAIL_DELAY = 300  # seconds after an open before the delayed property email
+delayed_property_tasks: Set[asyncio.Task] = set()  # pending delayed sends
+
+# Recipients known to have a property email, so repeat opens skip the lookup.
+# Only positive answers are kept: a send from elsewhere must never be hidden.
+sent_property_emails = TTLCache(maxsize=1024, ttl=600)
+sent_property_emails_lock = threading.Lock()  # webhook batches run in worker threads
+
 class SendGridWebhookHandler:
     """Handles SendGrid webhook events for email tracking"""
     
@@ -51,36 +84,64 @@ class SendGridWebhookHandler:
             return True
             
         try:
-            # Create expected signature
-            public_key = base64.b64decode(self.webhook_verify_key)
-            payload = timestamp.encode('utf-8') + request_body
-            expected_signature = base64.b64encode(
-                hmac.new(public_key, payload, hashlib.sha256).digest()
-            ).decode('utf-8')
-            
-            # Compare signatures
-            return hmac.compare_digest(signature, expected_signature)
+            signature_mac = self.start_signature_check(timestamp)
+            signature_mac.update(request_body)
+            return self.signature_matches(signature_mac, signature)
             
         except Exception as e:
             logger.error(f"❌ Webhook signature verification failed: {e}")
             return False
+
+    def start_signature_check(self, timestamp: str) -> Optional[hmac.HMAC]:
+        """
+        Start an incremental signature check, for bodies that are read as a stream
+        
+        Args:
+            timestamp: Timestamp from X-Twilio-Email-Event-Webhook-Timestamp header
+            
+        Returns:
+            HMAC to feed the body into, or None when no verify key is configured
+        """
+        if not self.webhook_verify_key:
+            logger.warning("⚠️ SENDGRID_WEBHOOK_VERIFY_KEY not configured - skipping verification")
+            return None
+        public_key = base64.b64decode(self.webhook_verify_key)
+        return hmac.new(public_key, timestamp.encode('utf-8'), hashlib.sha256)
+
+    @staticmethod
+    def signature_matches(signature_mac: hmac.HMAC, signature: str) -> bool:
+        """Compare the signature header against an HMAC fed with the whole body"""
+        expected_signature = base64.b64encode(signature_mac.digest()).decode('utf-8')
+        return hmac.compare_digest(signature, expected_signature)
     
-    def process_webhook_events(self, events: List[Dict]) -> Dict:
+    def process_webhook_events(self, events: List[Dict], results: Optional[Dict] = None) -> Dict:
         """
         Process multiple webhook events from SendGrid
         
+        Events for the same message are merged into one tracking update, so a
+        batch costs one write per message instead of a select and an update
+        per event.
+        
         Args:
             events: List of event dictionaries from SendGrid
+            results: Summary to add these events to, when a request's events
+                are processed in several sub-batches
             
         Returns:
             Processing summary
         """
-        results = {
-            "total_events": len(events),
-            "processed": 0,
-            "errors": 0,
-            "event_types": {}
-        }
+        if results is None:
+            results = {
+                "total_events": 0,
+                "processed": 0,
+                "errors": 0,
+                "event_types": {}
+            }
+        results["total_events"] += len(events)
+        
+        # message_id -> merged tracking columns, and the events that produced them
+        updates: Dict[str, Dict] = {}
+        message_events: Dict[str, List[Dict]] = {}
         
         for event in events:
             try:
@@ -89,25 +150,183 @@ class SendGridWebhookHandler:
                     results["event_types"][event_type] = 0
                 results["event_types"][event_type] += 1
                 
-                success = self.process_single_event(event)
-                if success:
-                    results["processed"] += 1
-                else:
+                message_id = event.get('sg_message_id')
+                if not message_id:
+                    logger.warning(f"⚠️ No message_id in event: {event_type}")
                     results["errors"] += 1
+                    continue
+                
+                columns = self._event_to_columns(event)
+                if columns is None:
+                    logger.info(f"ℹ️ Ignoring event type: {event_type}")
+                    results["processed"] += 1
+                    continue
+                
+                # Later events win, as they did when each one was written in turn
+                updates.setdefault(message_id, {}).update(columns)
+                message_events.setdefault(message_id, []).append(event)
                     
             except Exception as e:
                 logger.error(f"❌ Error processing event: {e}")
                 results["errors"] += 1
         
+        # One query for every tracking row (and its business card) the batch touches
+        tracking_cache = self._prefetch_tracking(list(updates))
+        
+        for message_id, columns in updates.items():
+            batch = message_events[message_id]
+            try:
+                success = self.update_email_tracking(message_id, tracking_cache=tracking_cache, **columns)
+                results["processed" if success else "errors"] += len(batch)
+                
+                # Property email triggers run once per event type for the message
+                latest = {event.get('event'): event for event in batch}
+                for event in latest.values():
+                    self._handle_event_side_effects(event, tracking_cache)
+                    
+            except Exception as e:
+                logger.error(f"❌ Error processing events for {message_id}: {e}")
+                results["errors"] += len(batch)
+        
         logger.info(f"📊 Webhook processing complete: {results}")
         return results
     
-    def process_single_event(self, event: Dict) -> bool:
+    def _prefetch_tracking(self, message_ids: List[str]) -> Optional[Dict[str, Dict]]:
+        """
+        Load the email tracking rows for a batch of messages in one query
+        
+        Args:
+            message_ids: SendGrid message IDs in the batch
+            
+        Returns:
+            Tracking rows (with their business card) keyed by message_id, or
+            None if they couldn't be loaded and each event should look its own up
+        """
+        if not self.supabase or not message_ids:
+            return None
+        
+        try:
+            result = self.supabase.table("email_tracking")\
+                .select(TRACKING_SELECT)\
+                .in_("message_id", message_ids)\
+                .execute()
+        except Exception as e:
+            logger.error(f"❌ Error prefetching email tracking: {e}")
+            return None
+        
+        tracking_cache = {}
+        for record in result.data:
+            # The welcome email row is the one the follow-up triggers work from
+            if record["message_id"] not in tracking_cache or record.get("email_type") == "welcome":
+                tracking_cache[record["message_id"]] = record
+        return tracking_cache
+    
+    def _find_welcome_tracking(self, message_id: str, tracking_cache: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Find the welcome email tracking record (with its business card) for a message
+        
+        Args:
+            message_id: SendGrid message ID
+            tracking_cache: Rows from _prefetch_tracking, used instead of a query
+            
+        Returns:
+            Tracking record, or None if the message isn't a tracked welcome email
+        """
+        if tracking_cache is not None:
+            record = tracking_cache.get(message_id)
+            return record if record and record.get("email_type") == "welcome" else None
+        
+        tracking_result = self.supabase.table("email_tracking")\
+            .select(TRACKING_SELECT)\
+            .eq("message_id", message_id)\
+            .eq("email_type", "welcome")\
+            .execute()
+        return tracking_result.data[0] if tracking_result.data else None
+    
+    @staticmethod
+    def _event_to_columns(event: Dict) -> Optional[Dict]:
+        """
+        Map a SendGrid event to the email_tracking columns it sets
+        
+        Args:
+            event: Single event dictionary from SendGrid
+            
+        Returns:
+            Column values, or None for event types that aren't tracked
+        """
+        column = TRACKED_EVENT_COLUMNS.get(event.get('event'))
+        if column is None:
+            return None
+        
+        # Convert timestamp to datetime
+        timestamp = event.get('timestamp')
+        event_time = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+        return {column: event_time.isoformat()}
+    
+    def _handle_event_side_effects(self, event: Dict, tracking_cache: Optional[Dict] = None) -> None:
+        """
+        Trigger the follow-up work for opens and replies
+        
+        Args:
+            event: Single event dictionary from SendGrid
+            tracking_cache: Rows from _prefetch_tracking, if the batch was prefetched
+        """
+        event_type = event.get('event')
+        email = event.get('email')
+        
+        if event_type == 'open':
+            # IMMEDIATE property email trigger on open (more reliable than reply detection)
+            logger.info(f"📖 Welcome email opened by {email} - triggering property email immediately")
+            self.check_and_send_property_email_immediately(event, tracking_cache)
+        elif event_type == 'reply':
+            # Handle email reply - trigger property availability email
+            logger.info(f"📬 REPLY EVENT DETECTED for {email}!")
+            logger.info(f"📬 Full reply event data: {orjson.dumps(event, option=orjson.OPT_INDENT_2).decode()}")
+            self.handle_email_reply(event, tracking_cache)
+        elif event_type == 'inbound':
+            # Alternative reply detection - SendGrid sometimes uses 'inbound' for replies
+            logger.info(f"📬 INBOUND EMAIL DETECTED for {email} - treating as reply!")
+            logger.info(f"📬 Full inbound event data: {orjson.dumps(event, option=orjson.OPT_INDENT_2).decode()}")
+            self.handle_email_reply(event, tracking_cache)
+    
+    def _property_email_already_sent(self, email: str) -> bool:
+        """
+        Check whether a property availability email exists for a recipient
+        
+        Args:
+            email: Recipient email address
+            
+        Returns:
+            True if one has already been sent
+        """
+        with sent_property_emails_lock:
+            if email in sent_property_emails:
+                return True
+        
+        property_email_check = self.supabase.table("email_tracking")\
+            .select("id")\
+            .eq("email_address", email)\
+            .eq("email_type", "property_availability")\
+            .execute()
+        
+        if property_email_check.data:
+            self._remember_property_email_sent(email)
+            return True
+        return False
+    
+    @staticmethod
+    def _remember_property_email_sent(email: str) -> None:
+        """Record that a recipient has a property email, for repeat opens"""
+        with sent_property_emails_lock:
+            sent_property_emails[email] = True
+    
+    def process_single_event(self, event: Dict, tracking_cache: Optional[Dict] = None) -> bool:
         """
         Process a single SendGrid event
         
         Args:
             event: Single event dictionary from SendGrid
+            tracking_cache: Rows from _prefetch_tracking, used instead of per-event lookups
             
         Returns:
             True if processed successfully
@@ -116,61 +335,34 @@ class SendGridWebhookHandler:
             event_type = event.get('event')
             message_id = event.get('sg_message_id')
             email = event.get('email')
-            timestamp = event.get('timestamp')
             
             if not message_id:
                 logger.warning(f"⚠️ No message_id in event: {event_type}")
                 return False
             
-            # Convert timestamp to datetime
-            event_time = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
-            
             logger.info(f"📧 Processing {event_type} event for {email} (ID: {message_id})")
             
-            # Update email tracking based on event type
-            if event_type == 'delivered':
-                return self.update_email_tracking(message_id, delivered_at=event_time)
-            elif event_type == 'open':
-                # When email is opened, immediately check if we should trigger property email
-                result = self.update_email_tracking(message_id, opened_at=event_time)
-                
-                # IMMEDIATE property email trigger on open (more reliable than reply detection)
-                logger.info(f"📖 Welcome email opened by {email} - triggering property email immediately")
-                self.check_and_send_property_email_immediately(event)
-                
-                return result
-            elif event_type == 'click':
-                return self.update_email_tracking(message_id, clicked_at=event_time)
-            elif event_type == 'bounce':
-                return self.update_email_tracking(message_id, bounced_at=event_time)
-            elif event_type == 'unsubscribe':
-                return self.update_email_tracking(message_id, unsubscribed_at=event_time)
-            elif event_type == 'reply':
-                # Handle email reply - trigger property availability email
-                logger.info(f"📬 REPLY EVENT DETECTED for {email}!")
-                logger.info(f"📬 Full reply event data: {json.dumps(event, indent=2)}")
-                self.handle_email_reply(event)
-                return self.update_email_tracking(message_id, replied_at=event_time)
-            elif event_type == 'inbound':
-                # Alternative reply detection - SendGrid sometimes uses 'inbound' for replies
-                logger.info(f"📬 INBOUND EMAIL DETECTED for {email} - treating as reply!")
-                logger.info(f"📬 Full inbound event data: {json.dumps(event, indent=2)}")
-                self.handle_email_reply(event)
-                return self.update_email_tracking(message_id, replied_at=event_time)
-            else:
+            columns = self._event_to_columns(event)
+            if columns is None:
                 logger.info(f"ℹ️ Ignoring event type: {event_type}")
                 return True
+            
+            # Update email tracking based on event type
+            result = self.update_email_tracking(message_id, tracking_cache=tracking_cache, **columns)
+            self._handle_event_side_effects(event, tracking_cache)
+            return result
                 
         except Exception as e:
             logger.error(f"❌ Error processing single event: {e}")
             return False
     
-    def update_email_tracking(self, message_id: str, **kwargs) -> bool:
+    def update_email_tracking(self, message_id: str, tracking_cache: Optional[Dict] = None, **kwargs) -> bool:
         """
         Update email tracking record with event data
         
         Args:
             message_id: SendGrid message ID
+            tracking_cache: Rows from _prefetch_tracking; messages missing from it are skipped
             **kwargs: Fields to update (opened_at, clicked_at, etc.)
             
         Returns:
@@ -180,63 +372,62 @@ class SendGridWebhookHandler:
             logger.error("❌ Supabase client not available")
             return False
             
-        try:
-            # Find the email tracking record
-            result = self.supabase.table("email_tracking")\
-                .select("*")\
-                .eq("message_id", message_id)\
-                .execute()
-            
-            if not result.data:
-                logger.warning(f"⚠️ No email tracking record found for message_id: {message_id}")
-                return False
+        if tracking_cache is not None and message_id not in tracking_cache:
+            logger.warning(f"⚠️ No email tracking record found for message_id: {message_id}")
+            return False
             
-            # Update the record
+        try:
             update_data = {k: v.isoformat() if hasattr(v, 'isoformat') else v 
                           for k, v in kwargs.items()}
             
+            # The update returns the rows it matched, so no lookup is needed first
             update_result = self.supabase.table("email_tracking")\
                 .update(update_data)\
                 .eq("message_id", message_id)\
                 .execute()
             
-            if update_result.data:
-                logger.info(f"✅ Updated email tracking for {message_id}: {kwargs}")
-                
-                # Special handling for email opens - update business card record too
-                if 'opened_at' in kwargs:
-                    self.update_business_card_email_status(message_id)
-                
-                return True
-            else:
-                logger.error(f"❌ Failed to update email tracking for {message_id}")
+            if not update_result.data:
+                logger.warning(f"⚠️ No email tracking record found for message_id: {message_id}")
                 return False
+            
+            logger.info(f"✅ Updated email tracking for {message_id}: {kwargs}")
+            
+            # Special handling for email opens - update business card record too
+            if 'opened_at' in kwargs:
+                self.update_business_card_email_status(message_id, tracking_cache)
+            
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Error updating email tracking: {e}")
             return False
     
-    def update_business_card_email_status(self, message_id: str) -> bool:
+    def update_business_card_email_status(self, message_id: str, tracking_cache: Optional[Dict] = None) -> bool:
         """
         Update business card email status when email is opened
         
         Args:
             message_id: SendGrid message ID
+            tracking_cache: Rows from _prefetch_tracking, used instead of a query
             
         Returns:
             True if updated successfully
         """
         try:
             # Get the business card ID from email tracking
-            tracking_result = self.supabase.table("email_tracking")\
-                .select("business_card_id")\
-                .eq("message_id", message_id)\
-                .execute()
+            if tracking_cache is not None:
+                tracking_record = tracking_cache.get(message_id)
+            else:
+                tracking_result = self.supabase.table("email_tracking")\
+                    .select("business_card_id")\
+                    .eq("message_id", message_id)\
+                    .execute()
+                tracking_record = tracking_result.data[0] if tracking_result.data else None
             
-            if not tracking_result.data:
+            if not tracking_record:
                 return False
             
-            business_card_id = tracking_result.data[0]["business_card_id"]
+            business_card_id = tracking_record["business_card_id"]
             
             # Update business card with email opened status
             self.supabase.table("business_cards")\
@@ -251,12 +442,13 @@ class SendGridWebhookHandler:
             logger.error(f"❌ Error updating business card email status: {e}")
             return False
 
-    def handle_email_reply(self, event: Dict) -> None:
+    def handle_email_reply(self, event: Dict, tracking_cache: Optional[Dict] = None) -> None:
         """
         Handle email reply events and trigger property availability emails
         
         Args:
             event: SendGrid reply event data
+            tracking_cache: Rows from _prefetch_tracking, used instead of a query
         """
         try:
             message_id = event.get('sg_message_id')
@@ -270,17 +462,12 @@ class SendGridWebhookHandler:
                 return
             
             # Find the original email tracking record
-            tracking_result = self.supabase.table("email_tracking")\
-                .select("*, business_cards!business_card_id(id, name, email, company)")\
-                .eq("message_id", message_id)\
-                .eq("email_type", "welcome")\
-                .execute()
+            tracking_record = self._find_welcome_tracking(message_id, tracking_cache)
             
-            if not tracking_result.data:
+            if not tracking_record:
                 logger.warning(f"⚠️ No welcome email tracking found for reply from {email}")
                 return
             
-            tracking_record = tracking_result.data[0]
             business_card = tracking_record.get("business_cards")
             
             if not business_card:
@@ -288,13 +475,7 @@ class SendGridWebhookHandler:
                 return
             
             # Check if we've already sent a property email to avoid duplicates
-            property_email_check = self.supabase.table("email_tracking")\
-                .select("id")\
-                .eq("email_address", email)\
-                .eq("email_type", "property_availability")\
-                .execute()
-            
-            if property_email_check.data:
+            if self._property_email_already_sent(email):
                 logger.info(f"ℹ️ Property email already sent to {email}, skipping duplicate")
                 return
             
@@ -313,6 +494,7 @@ class SendGridWebhookHandler:
                 
                 if result.get("success"):
                     logger.info(f"🏢 ✅ Property availability email sent to {email}")
+                    self._remember_property_email_sent(email)
                     
                     # Update the original email tracking to mark reply handled
                     self.supabase.table("email_tracking")\
@@ -339,7 +521,7 @@ class SendGridWebhookHandler:
             List of parsed event dictionaries
         """
         try:
-            events_data = json.loads(request_body.decode('utf-8'))
+            events_data = orjson.loads(request_body)
             
             # SendGrid sends events as an array
             if isinstance(events_data, list):
@@ -354,6 +536,74 @@ class SendGridWebhookHandler:
             logger.error(f"❌ Error parsing webhook events: {e}")
             return []
 
+    async def parse_webhook_events_stream(self, chunks: AsyncIterator[bytes],
+                                          signature_mac: Optional[hmac.HMAC] = None) -> AsyncIterator[Dict]:
+        """
+        Parse SendGrid webhook events as the request body streams in
+        
+        Each event object is decoded as soon as its closing brace arrives, so
+        events can be processed before the upload completes and only the event
+        being read is buffered rather than the whole batch.
+        
+        Args:
+            chunks: Raw request body chunks (e.g. request.stream())
+            signature_mac: Optional HMAC from start_signature_check, fed every chunk
+            
+        Yields:
+            Parsed event dictionaries
+        """
+        buffer = bytearray()
+        scanned = 0
+        start = 0
+        depth = 0
+        in_string = False
+        parsed = 0
+        
+        async for chunk in chunks:
+            if signature_mac is not None:
+                signature_mac.update(chunk)
+            buffer += chunk
+            
+            complete = []
+            end = len(buffer)
+            for match in EVENT_TOKEN_RE.finditer(buffer, scanned):
+                token = match.group()
+                if token == b"\\":
+                    end = match.start()  # rescan the escape once its next byte arrives
+                    break
+                if in_string:
+                    if token == b'"':
+                        in_string = False
+                elif token == b'"':
+                    in_string = depth > 0
+                elif token == b"{":
+                    if not depth:
+                        start = match.start()
+                    depth += 1
+                elif token == b"}" and depth:
+                    depth -= 1
+                    if not depth:
+                        complete.append(bytes(buffer[start:match.end()]))
+            
+            # Drop everything before the event still being read
+            cut = start if depth else end
+            del buffer[:cut]
+            scanned = end - cut
+            start = 0
+            
+            for raw_event in complete:
+                try:
+                    event = orjson.loads(raw_event)
+                except orjson.JSONDecodeError as e:
+                    logger.error(f"❌ Error parsing webhook event: {e}")
+                    continue
+                parsed += 1
+                yield event
+        
+        if depth:
+            logger.error("❌ Webhook body ended in the middle of an event")
+        logger.info(f"📧 Parsed {parsed} webhook events")
+
     async def process_webhook_event(self, event: Dict) -> Dict:
         """
         Process a single webhook event (async wrapper for synchronous processing)
@@ -407,17 +657,12 @@ class SendGridWebhookHandler:
                 return
             
             # Find the email tracking record
-            tracking_result = self.supabase.table("email_tracking")\
-                .select("*, business_cards!business_card_id(id, name, email, company)")\
-                .eq("message_id", message_id)\
-                .eq("email_type", "welcome")\
-                .execute()
+            tracking_record = self._find_welcome_tracking(message_id)
             
-            if not tracking_result.data:
+            if not tracking_record:
                 logger.info(f"ℹ️ No welcome email tracking found for opened email from {email}")
                 return
             
-            tracking_record = tracking_result.data[0]
             business_card = tracking_record.get("business_cards")
             
             if not business_card:
@@ -430,13 +675,7 @@ class SendGridWebhookHandler:
                 return
             
             # Check if property email already exists in tracking table
-            property_email_check = self.supabase.table("email_tracking")\
-                .select("id")\
-                .eq("email_address", email)\
-                .eq("email_type", "property_availability")\
-                .execute()
-            
-            if property_email_check.data:
+            if self._property_email_already_sent(email):
                 logger.info(f"ℹ️ Property email already exists in tracking for {email}, marking original as sent")
                 # Mark the original email as having property email sent
                 self.supabase.table("email_tracking")\
@@ -462,6 +701,7 @@ class SendGridWebhookHandler:
                 
                 if result.get("success"):
                     logger.info(f"🏢 ✅ Property availability email sent to {email} (auto-triggered)")
+                    self._remember_property_email_sent(email)
                     
                     # Update the original email tracking to mark property email sent
                     self.supabase.table("email_tracking")\
@@ -477,13 +717,14 @@ class SendGridWebhookHandler:
         except Exception as e:
             logger.error(f"❌ Error checking for property email trigger: {e}")
 
-    def check_and_send_property_email_immediately(self, event: Dict) -> None:
+    def check_and_send_property_email_immediately(self, event: Dict, tracking_cache: Optional[Dict] = None) -> None:
         """
         IMMEDIATE property email trigger when welcome email is opened
         More reliable than waiting for replies
         
         Args:
             event: SendGrid open event data
+            tracking_cache: Rows from _prefetch_tracking, used instead of a query
         """
         try:
             message_id = event.get('sg_message_id')
@@ -496,17 +737,12 @@ class SendGridWebhookHandler:
                 return
             
             # Find the email tracking record for welcome email
-            tracking_result = self.supabase.table("email_tracking")\
-                .select("*, business_cards!business_card_id(id, name, email, company)")\
-                .eq("message_id", message_id)\
-                .eq("email_type", "welcome")\
-                .execute()
+            tracking_record = self._find_welcome_tracking(message_id, tracking_cache)
             
-            if not tracking_result.data:
+            if not tracking_record:
                 logger.info(f"ℹ️ No welcome email tracking found for {email}")
                 return
             
-            tracking_record = tracking_result.data[0]
             business_card = tracking_record.get("business_cards")
             
             if not business_card:
@@ -519,13 +755,7 @@ class SendGridWebhookHandler:
                 return
             
             # Double-check if property email already exists in tracking table
-            property_email_check = self.supabase.table("email_tracking")\
-                .select("id")\
-                .eq("email_address", email)\
-                .eq("email_type", "property_availability")\
-                .execute()
-            
-            if property_email_check.data:
+            if self._property_email_already_sent(email):
                 logger.info(f"ℹ️ Property email record already exists for {email}, marking original as sent")
                 self.supabase.table("email_tracking")\
                     .update({"property_email_sent": True})\
@@ -549,12 +779,14 @@ class SendGridWebhookHandler:
                 
                 if result.get("success"):
                     logger.info(f"🏢 ✅ IMMEDIATE property email sent to {email}!")
+                    self._remember_property_email_sent(email)
                     
                     # Mark the original welcome email as having property email sent
                     self.supabase.table("email_tracking")\
                         .update({"property_email_sent": True})\
                         .eq("id", tracking_record["id"])\
                         .execute()
+                    tracking_record["property_email_sent"] = True  # keep a prefetched row current
                     
                     logger.info(f"✅ Property email tracking updated for {email}")
                 else:
@@ -570,7 +802,7 @@ class SendGridWebhookHandler:
             import traceback
             logger.error(f"❌ Full traceback: {traceback.format_exc()}")
 
-    def schedule_delayed_property_email(self, event: Dict) -> None:
+    async def schedule_delayed_property_email(self, event: Dict) -> None:
         """
         Schedule property email to be sent 5 minutes after email is opened
         This gives users time to reply, but ensures they get property email either way
@@ -589,53 +821,59 @@ class SendGridWebhookHandler:
                 return
             
             # Mark this email as having a property email scheduled
-            self.supabase.table("email_tracking")\
+            await asyncio.to_thread(
+                self.supabase.table("email_tracking")
                 .update({
                     "property_email_scheduled_at": datetime.now().isoformat()
-                })\
-                .eq("message_id", message_id)\
-                .execute()
+                })
+                .eq("message_id", message_id)
+                .execute
+            )
             
-            # Import threading to run delayed task
-            import threading
-            import time
+            # A sleeping task instead of a thread per open; the loop only keeps a
+            # weak reference, so hold it until it finishes
+            task = asyncio.create_task(self._delayed_property_email(event))
+            delayed_property_tasks.add(task)
+            task.add_done_callback(delayed_property_tasks.discard)
             
-            def delayed_property_email():
-                time.sleep(300)  # Wait 5 minutes
+        except Exception as e:
+            logger.error(f"❌ Error scheduling delayed property email: {e}")
+
+    async def _delayed_property_email(self, event: Dict) -> None:
+        """Send the property email after the delay unless the user replied in the meantime"""
+        message_id = event.get('sg_message_id')
+        email = event.get('email')
+        
+        await asyncio.sleep(PROPERTY_EMAIL_DELAY)
+        
+        # Check if user replied in the meantime
+        try:
+            tracking_check = await asyncio.to_thread(
+                self.supabase.table("email_tracking")
+                .select("replied_at, property_email_sent")
+                .eq("message_id", message_id)
+                .execute
+            )
+            
+            if tracking_check.data:
+                record = tracking_check.data[0]
                 
-                # Check if user replied in the meantime
-                try:
-                    tracking_check = self.supabase.table("email_tracking")\
-                        .select("replied_at, property_email_sent")\
-                        .eq("message_id", message_id)\
-                        .execute()
-                    
-                    if tracking_check.data:
-                        record = tracking_check.data[0]
-                        
-                        # If user replied, don't send (reply should have triggered it already)
-                        if record.get("replied_at"):
-                            logger.info(f"ℹ️ User {email} replied - property email should have been sent via reply handler")
-                            return
-                        
-                        # If property email already sent, skip
-                        if record.get("property_email_sent"):
-                            logger.info(f"ℹ️ Property email already sent to {email}")
-                            return
-                    
-                    # Send property email after delay
-                    logger.info(f"⏰ Sending delayed property email to {email}")
-                    self.check_and_send_property_email(event)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error in delayed property email for {email}: {e}")
+                # If user replied, don't send (reply should have triggered it already)
+                if record.get("replied_at"):
+                    logger.info(f"ℹ️ User {email} replied - property email should have been sent via reply handler")
+                    return
+                
+                # If property email already sent, skip
+                if record.get("property_email_sent"):
+                    logger.info(f"ℹ️ Property email already sent to {email}")
+                    return
             
-            # Start background thread for delayed sending
-            thread = threading.Thread(target=delayed_property_email, daemon=True)
-            thread.start()
+            # Send property email after delay
+            logger.info(f"⏰ Sending delayed property email to {email}")
+            await asyncio.to_thread(self.check_and_send_property_email, event)
             
         except Exception as e:
-            logger.error(f"❌ Error scheduling delayed property email: {e}")
+            logger.error(f"❌ Error in delayed property email for {email}: {e}")
 
 # Factory function
 def create_webhook_handler(supabase_client=None) -> SendGridWebhookHandler: